@@ -0,0 +1,136 @@
+from queries.benchmarks.synthetic import matching_count
+
+# Number of shards the fake pretends each index has, used to size sampler aggregations
+FAKE_SHARDS = 2
+
+
+class FakeIndices:
+    """
+    Stand-in for the client's indices namespace, reporting every requested field as a mapped date.
+    """
+
+    def get_field_mapping(self, index=None, fields=None):
+        return {index: {"mappings": {fields: {"full_name": fields, "mapping": {fields: {"type": "date"}}}}}}
+
+
+class FakeOpenSearch:
+    """
+    In-memory stand-in for the OpenSearch client that answers the docketId_stats aggregations
+    sent by queries.utils.query_opensearch from a synthetic corpus.
+    """
+
+    def __init__(self, corpus):
+        self.corpus = corpus
+        self.calls = 0
+        self.indices = FakeIndices()
+        self._buckets = {}
+
+    def buckets(self, index_name, search_term):
+        """
+        Returns (docket_id, total, match) for every docket in an index, computed once per term.
+        """
+        key = (index_name, search_term)
+        if key not in self._buckets:
+            self._buckets[key] = [
+                (docket_id, total, matching_count(search_term, index_name, docket_id, total))
+                for docket_id, total in self.corpus[index_name].items()
+                if total > 0
+            ]
+        return self._buckets[key]
+
+    def count(self, index=None, body=None):
+        self.calls += 1
+        return {"count": sum(self.corpus[index].values())}
+
+    def search(self, index=None, body=None):
+        self.calls += 1
+        return self._answer(index, body)
+
+    def _answer(self, index, body):
+        aggs = body["aggs"]
+        query = body.get("query", {})
+
+        if "sample" in aggs:
+            return self._sampled_response(index, body)
+
+        stats = aggs["docketId_stats"]
+        if "composite" in stats:
+            return self._composite_response(index, stats)
+        if "range" in query:
+            # Synthetic corpora are static, so nothing has been indexed since any refresh
+            return _response([])
+        if "aggs" not in stats:
+            return _response([
+                {"key": docket_id, "doc_count": total}
+                for docket_id, total in sorted(self.corpus[index].items()) if total > 0
+            ])
+
+        search_term = next(iter(stats["aggs"]["matching_comments"]["filter"]["match_phrase"].values()))
+        rows = self.buckets(index, search_term)
+
+        if "terms" in query:
+            wanted = set(next(iter(query["terms"].values())))
+            rows = [row for row in rows if row[0] in wanted]
+
+        if "order" in stats["terms"]:
+            rows = sorted(rows, key=lambda row: row[2], reverse=True)
+        else:
+            rows = sorted(rows, key=lambda row: row[1], reverse=True)
+        rows = rows[:stats["terms"]["size"]]
+
+        return _response([
+            {"key": docket_id, "doc_count": total, "matching_comments": {"doc_count": match}}
+            for docket_id, total, match in rows
+        ])
+
+    def msearch(self, body=None):
+        self.calls += 1
+        return {"responses": [
+            self._answer(header["index"], query) for header, query in zip(body[::2], body[1::2])
+        ]}
+
+    def _composite_response(self, index_name, stats):
+        search_term = next(iter(stats["aggs"]["matching_comments"]["filter"]["match_phrase"].values()))
+        rows = sorted(self.buckets(index_name, search_term))
+        after = stats["composite"].get("after", {}).get("docketId")
+        if after is not None:
+            rows = [row for row in rows if row[0] > after]
+        rows = rows[:stats["composite"]["size"]]
+
+        response = _response([
+            {"key": {"docketId": docket_id}, "doc_count": total, "matching_comments": {"doc_count": match}}
+            for docket_id, total, match in rows
+        ])
+        if rows:
+            response["aggregations"]["docketId_stats"]["after_key"] = {"docketId": rows[-1][0]}
+        return response
+
+    def _sampled_response(self, index_name, body):
+        """
+        Keeps shard_size matching documents per shard, assuming scores are spread evenly across
+        dockets so each docket contributes the same share of its matches to the sample.
+        """
+        search_term = next(iter(body["query"]["match_phrase"].values()))
+        rows = self.buckets(index_name, search_term)
+        match_total = sum(match for _, _, match in rows)
+        sample_size = min(match_total, body["aggs"]["sample"]["sampler"]["shard_size"] * FAKE_SHARDS)
+        ratio = sample_size / match_total if match_total else 1.0
+
+        buckets = []
+        for docket_id, _, match in rows:
+            sampled = int(match * ratio)
+            if sampled > 0:
+                buckets.append({"key": docket_id, "doc_count": sampled})
+
+        return {
+            "timed_out": False,
+            "hits": {"total": {"value": match_total, "relation": "eq"}},
+            "aggregations": {"sample": {
+                "doc_count": sum(bucket["doc_count"] for bucket in buckets),
+                "docketId_stats": {"buckets": buckets}
+            }}
+        }
+
+
+def _response(buckets):
+    return {"timed_out": False, "aggregations": {"docketId_stats": {"buckets": buckets}}}
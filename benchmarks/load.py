@@ -0,0 +1,223 @@
+"""
+Concurrent load replay for search(), run against the same stand-ins as the offline benchmarks.
+Replays a trace of search_params dicts at one or more concurrency levels and reports throughput,
+latency percentiles overall and per pipeline stage, and the connections opened, OpenSearch calls made
+and errors counted at each level.
+Errors the pipeline prints and recovers from are counted separately from the ones search() raises;
+on the shared connection each of them also rolls back the other requests' uncommitted work.
+
+Usage (from the directory containing the `queries` package):
+    python -m queries.benchmarks.load --dockets 10000 --requests 500 --concurrency 1,4,16
+    python -m queries.benchmarks.load --trace recorded_trace.jsonl --concurrency 8
+"""
+import argparse
+import copy
+import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from queries.benchmarks.postgres import clear_stored_results, connect_local
+from queries.benchmarks.run import setup_environment
+from queries.benchmarks.synthetic import WORDS
+from queries.utils.timing import set_error_recorder, set_stage_recorder
+
+SORT_TYPES = ["dateModified", "alphaByTitle", "relevance"]
+
+
+def synthetic_trace(num_requests, agency_ids, num_terms=20, num_sessions=50, refresh_ratio=0.2, seed=0):
+    """
+    Generates a trace of search_params dicts mixing refreshes and page flips across
+    search terms, sessions, sort orders and filters. Each page flip reuses the exact term, session,
+    sort and filters of an earlier refresh, so it reads stored results; until the first refresh,
+    every request is a refresh.
+    """
+    rng = random.Random(seed)
+    terms = [" ".join(rng.sample(WORDS, rng.choice([1, 1, 2]))) for _ in range(num_terms)]
+
+    trace = []
+    refreshed = []
+    for _ in range(num_requests):
+        if refreshed and rng.random() >= refresh_ratio:
+            trace.append(dict(copy.deepcopy(rng.choice(refreshed)), pageNumber=rng.randrange(10),
+                              refreshResults=False))
+            continue
+
+        agencies = rng.sample(agency_ids, rng.randint(1, 3)) if rng.random() < 0.3 else []
+        search_params = {
+            "searchTerm": rng.choice(terms),
+            "pageNumber": 0,
+            "refreshResults": True,
+            "sessionID": f"session{rng.randrange(num_sessions)}",
+            "sortParams": {"sortType": rng.choice(SORT_TYPES), "desc": rng.random() < 0.8},
+            "filterParams": {
+                "agencies": agencies,
+                "dateRange": {"start": "1970-01-01T00:00:00Z", "end": "2030-01-01T00:00:00Z"},
+                "docketType": rng.choice(["", "", "Rulemaking", "Nonrulemaking"]),
+            },
+        }
+        refreshed.append(search_params)
+        trace.append(copy.deepcopy(search_params))
+    return trace
+
+
+def load_trace(path):
+    """
+    Reads a recorded trace with one search_params JSON object per line.
+    """
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(sorted_values, p):
+    """
+    Returns the p-th percentile of an already sorted list using the nearest-rank method.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        "count": len(timings),
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p95_ms": percentile(timings, 95) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+    }
+
+
+def replay(search, trace, concurrency):
+    """
+    Replays the trace with `concurrency` workers issuing requests back to back.
+
+    Returns:
+        dict: Throughput, overall and per-stage latency percentiles, and the counts of raised errors
+              and of handled errors per location.
+    """
+    lock = threading.Lock()
+    latencies = []
+    stages = {}
+    errors = []
+    handled = {}
+
+    def record_stage(name, seconds):
+        with lock:
+            stages.setdefault(name, []).append(seconds)
+
+    def record_error(location, error):
+        with lock:
+            handled.setdefault(location, []).append(repr(error))
+
+    def run(search_params):
+        start = time.perf_counter()
+        try:
+            search(search_params)
+        except Exception as e:
+            with lock:
+                errors.append(repr(e))
+            return
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    set_stage_recorder(record_stage)
+    set_error_recorder(record_error)
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(run, trace))
+    finally:
+        set_stage_recorder(None)
+        set_error_recorder(None)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(trace),
+        "elapsed_s": elapsed,
+        "throughput_rps": len(trace) / elapsed if elapsed else 0.0,
+        "latency": summarize(latencies),
+        "stages": {name: summarize(timings) for name, timings in sorted(stages.items())},
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "handled_errors": {location: len(samples) for location, samples in sorted(handled.items())},
+        "handled_error_samples": sorted({sample for samples in handled.values() for sample in samples})[:5],
+    }
+
+
+def print_report(report):
+    latency = report["latency"]
+    print(f"\nconcurrency {report['concurrency']}: {report['throughput_rps']:.1f} req/s over {report['requests']} requests, "
+          f"{report['errors']} errors, {sum(report['handled_errors'].values())} handled errors, "
+          f"{report['connections']} connections, {report['opensearch_calls']} OpenSearch calls")
+    print(f"{'stage':<20}{'count':>8}{'p50 ms':>12}{'p95 ms':>12}{'p99 ms':>12}")
+    rows = [("overall", latency)] + list(report["stages"].items())
+    for name, stats in rows:
+        print(f"{name:<20}{stats['count']:>8}{stats['p50_ms']:>12.2f}{stats['p95_ms']:>12.2f}{stats['p99_ms']:>12.2f}")
+    for sample in report["error_samples"]:
+        print(f"  error: {sample}")
+    for location, count in report["handled_errors"].items():
+        print(f"  handled in {location}: {count}")
+    for sample in report["handled_error_samples"]:
+        print(f"  handled error: {sample}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Replay a search trace at a target concurrency.")
+    arg_parser.add_argument("--dockets", type=int, default=10000, help="number of synthetic dockets")
+    arg_parser.add_argument("--seed", type=int, default=0, help="corpus and trace seed")
+    arg_parser.add_argument("--trace", help="JSONL file of recorded search_params; a synthetic trace is used otherwise")
+    arg_parser.add_argument("--requests", type=int, default=500, help="length of the synthetic trace")
+    arg_parser.add_argument("--terms", type=int, default=20, help="distinct terms in the synthetic trace")
+    arg_parser.add_argument("--sessions", type=int, default=50, help="distinct sessions in the synthetic trace")
+    arg_parser.add_argument("--refresh-ratio", type=float, default=0.2, help="share of refreshes in the synthetic trace")
+    arg_parser.add_argument("--concurrency", default="1,4,16", help="comma separated concurrency levels")
+    arg_parser.add_argument("--json", help="also write the reports to this file as JSON")
+    args = arg_parser.parse_args()
+
+    connections = []
+
+    def counting_connect():
+        conn = connect_local()
+        connections.append(conn)
+        return conn
+
+    corpus, fake_client, query = setup_environment(args.dockets, seed=args.seed, sql_connect=counting_connect)
+    from queries.utils import query_opensearch
+
+    if args.trace:
+        trace = load_trace(args.trace)
+    else:
+        agency_ids = [agency_id for agency_id, _ in corpus["agencies"]]
+        trace = synthetic_trace(args.requests, agency_ids, num_terms=args.terms, num_sessions=args.sessions,
+                                refresh_ratio=args.refresh_ratio, seed=args.seed)
+
+    reports = []
+    for concurrency in [int(level) for level in args.concurrency.split(",")]:
+        # Every level starts from the same cold state, as run.py's refresh_setup does
+        clear_stored_results(query.conn)
+        query_opensearch.invalidate_aggregation_cache()
+        query.forget_docket_metadata()
+        for searchTerm, sessionID in {(params["searchTerm"], params["sessionID"]) for params in trace}:
+            query.clear_prefetched_pages(searchTerm, sessionID)
+        connections_before = len(connections)
+        calls_before = fake_client.calls
+
+        report = replay(query.search, trace, concurrency)
+        report["connections"] = len(connections) - connections_before
+        report["opensearch_calls"] = fake_client.calls - calls_before
+
+        print_report(report)
+        reports.append(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"dockets": args.dockets, "reports": reports}, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import os
+import psycopg
+
+BENCHMARK_SCHEMA = "dp_bench"
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+SCHEMA_SQL = """
+CREATE TABLE agencies (
+    agency_id TEXT PRIMARY KEY,
+    agency_name TEXT
+);
+CREATE TABLE dockets (
+    docket_id TEXT PRIMARY KEY,
+    docket_title TEXT,
+    modify_date TIMESTAMPTZ,
+    docket_type TEXT,
+    agency_id TEXT,
+    docket_abstract TEXT
+);
+CREATE TABLE documents (
+    docket_id TEXT,
+    posted_date TIMESTAMPTZ,
+    comment_start_date TIMESTAMPTZ,
+    comment_end_date TIMESTAMPTZ,
+    effective_date TIMESTAMPTZ,
+    is_open_for_comment BOOLEAN
+);
+CREATE TABLE abstracts (
+    docket_id TEXT,
+    abstract TEXT
+);
+CREATE TABLE htm_summaries (
+    summary_id SERIAL PRIMARY KEY,
+    docket_id TEXT,
+    summary TEXT
+);
+CREATE TABLE stored_results (
+    search_term TEXT,
+    session_id TEXT,
+    sort_asc BOOLEAN,
+    sort_type TEXT,
+    filter_agencies TEXT,
+    filter_date_start TEXT,
+    filter_date_end TEXT,
+    filter_rulemaking TEXT,
+    search_rank INTEGER,
+    docket_id TEXT,
+    total_comments INTEGER,
+    matching_comments INTEGER,
+    relevance_score DOUBLE PRECISION
+);
+"""
+
+INDEX_SQL = """
+CREATE INDEX ON documents (docket_id);
+CREATE INDEX ON abstracts (docket_id);
+CREATE INDEX ON htm_summaries (docket_id);
+CREATE INDEX ON stored_results (search_term, session_id);
+"""
+
+
+def connect_local(schema=BENCHMARK_SCHEMA):
+    """
+    Connects to the local PostgreSQL server configured by the POSTGRES_* variables in `.env`,
+    with the benchmark schema first on the search path so the queries' unqualified table names resolve to it.
+    """
+    return psycopg.connect(
+        dbname=os.getenv("POSTGRES_DB", "postgres"),
+        user=os.getenv("POSTGRES_USER", "postgres"),
+        password=os.getenv("POSTGRES_PASSWORD"),
+        host=os.getenv("POSTGRES_HOST", "localhost"),
+        port=os.getenv("POSTGRES_PORT", "5432"),
+        options=f"-c search_path={schema}",
+    )
+
+
+def load_corpus(conn, corpus, schema=BENCHMARK_SCHEMA):
+    """
+    Recreates the benchmark schema and bulk loads a synthetic corpus into it with COPY.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {schema}")
+        cursor.execute(f"SET search_path = {schema}")
+        cursor.execute(SCHEMA_SQL)
+        with open(os.path.join(MIGRATIONS_DIR, "stored_results_refresh.sql")) as migration:
+            cursor.execute(migration.read())
+
+        tables = [
+            ("agencies (agency_id, agency_name)", corpus["agencies"]),
+            ("dockets (docket_id, docket_title, modify_date, docket_type, agency_id, docket_abstract)", corpus["dockets"]),
+            ("documents (docket_id, posted_date, comment_start_date, comment_end_date, effective_date, is_open_for_comment)",
+             corpus["documents"]),
+            ("abstracts (docket_id, abstract)", corpus["abstracts"]),
+            ("htm_summaries (docket_id, summary)", corpus["htm_summaries"]),
+        ]
+        for table, rows in tables:
+            with cursor.copy(f"COPY {table} FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+
+        cursor.execute(INDEX_SQL)
+        cursor.execute("ANALYZE")
+    conn.commit()
+
+
+def clear_stored_results(conn):
+    """
+    Empties the stored result tables between benchmark runs.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("TRUNCATE stored_results")
+        cursor.execute("TRUNCATE stored_results_refresh")
+    conn.commit()
@@ -0,0 +1,180 @@
+"""
+Offline benchmarks for the search pipeline, run against a synthetic corpus, an in-memory
+OpenSearch stand-in and a local PostgreSQL server.
+
+Usage (from the directory containing the `queries` package):
+    python -m queries.benchmarks.run --dockets 10000 --repeat 5 --term National
+"""
+import argparse
+import copy
+import json
+import statistics
+import time
+
+from queries.benchmarks import standins
+from queries.benchmarks.fake_opensearch import FakeOpenSearch
+from queries.benchmarks.postgres import clear_stored_results, connect_local, load_corpus
+from queries.benchmarks.synthetic import generate_corpus
+
+
+class CannedClient:
+    """
+    OpenSearch stand-in that returns one prepared response, so only response parsing is timed.
+    """
+
+    def __init__(self, response):
+        self.response = response
+
+    def search(self, index=None, body=None):
+        return self.response
+
+
+def bench(name, fn, setup=None, repeat=5):
+    """
+    Times fn over `repeat` runs. If setup is given, it is called untimed before each run and
+    its return value is passed to fn as positional arguments.
+    """
+    timings = []
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "name": name,
+        "repeat": repeat,
+        "min_ms": min(timings) * 1000,
+        "median_ms": statistics.median(timings) * 1000,
+        "mean_ms": statistics.mean(timings) * 1000,
+    }
+
+
+def search_params(term, refresh, page=0, session="bench"):
+    return {
+        "searchTerm": term,
+        "pageNumber": page,
+        "refreshResults": refresh,
+        "sessionID": session,
+        "sortParams": {"sortType": "dateModified", "desc": True},
+        "filterParams": {
+            "agencies": [],
+            "dateRange": {"start": "1970-01-01T00:00:00Z", "end": "2030-01-01T00:00:00Z"},
+            "docketType": "",
+        },
+    }
+
+
+def setup_environment(num_dockets, seed=0, sql_connect=connect_local):
+    """
+    Generates a corpus, loads it into the local PostgreSQL server, installs the stand-ins
+    and imports the search modules. sql_connect is the connect() function the search modules will use.
+
+    Returns:
+        tuple: The corpus, the fake OpenSearch client and the imported queries.query module.
+    """
+    corpus = generate_corpus(num_dockets, seed=seed)
+    fake_client = FakeOpenSearch(corpus)
+
+    setup_conn = connect_local()
+    load_corpus(setup_conn, corpus)
+    setup_conn.close()
+
+    standins.install(fake_client, sql_connect)
+
+    from queries import query
+    return corpus, fake_client, query
+
+
+def run_benchmarks(query, fake_client, term, repeat):
+    """
+    Runs every benchmark and returns a list of timing summaries.
+    """
+    from queries.utils import query_opensearch, query_sql
+
+    conn = query.conn
+    results = []
+
+    # query_OpenSearch response parsing
+    body = {"aggs": {"docketId_stats": {"terms": {"size": 1000000},
+                                        "aggs": {"matching_comments": {"filter": {"match_phrase": {"commentText": term}}}}}}}
+    query_opensearch.client = CannedClient(fake_client.search(index="comments", body=body))
+    results.append(bench("query_OpenSearch parsing",
+                         lambda: query_opensearch.query_OpenSearch(term, "comments", "commentText"), repeat=repeat))
+    query_opensearch.client = fake_client
+
+    os_results, _, _ = query.fetch_os_results(term)
+
+    # Each enrichment query runs on a fresh copy of the dockets it would see in search()
+    results.append(bench("append_docket_fields", lambda d: query_sql.append_docket_fields(d, conn),
+                         setup=lambda: (copy.deepcopy(os_results),), repeat=repeat))
+    with_fields = query_sql.append_docket_fields(copy.deepcopy(os_results), conn)
+    results.append(bench("append_agency_fields", lambda d: query_sql.append_agency_fields(d, conn),
+                         setup=lambda: (copy.deepcopy(with_fields),), repeat=repeat))
+    results.append(bench("append_document_dates", lambda d: query_sql.append_document_dates(d, conn),
+                         setup=lambda: (copy.deepcopy(with_fields),), repeat=repeat))
+    results.append(bench("append_summary", lambda d: query_sql.append_summary(d, conn),
+                         setup=lambda: (copy.deepcopy(with_fields),), repeat=repeat))
+
+    params = search_params(term, True)
+    enriched = query.enrich_and_score(copy.deepcopy(os_results), params["filterParams"])
+    results.append(bench("filter_dockets", lambda: query.filter_dockets(enriched, params["filterParams"]),
+                         repeat=repeat))
+    results.append(bench("calc_relevance_score", lambda: [query.calc_relevance_score(d) for d in enriched],
+                         repeat=repeat))
+
+    ranked = sorted(enriched, key=lambda x: x["comments"]["match"], reverse=True)
+
+    def store():
+        query.storeDockets(ranked, term, "bench-store", params["sortParams"], params["filterParams"], 100)
+
+    results.append(bench("storeDockets", store, setup=lambda: clear_stored_results(conn), repeat=repeat))
+
+    def refresh_setup():
+        clear_stored_results(conn)
+        query_opensearch.invalidate_aggregation_cache()
+        query.forget_docket_metadata()
+        query.clear_prefetched_pages(term, "bench")
+
+    results.append(bench("search (refresh)", lambda: query.search(search_params(term, True)),
+                         setup=refresh_setup, repeat=repeat))
+    results.append(bench("search (stored page)", lambda: query.search(search_params(term, False, page=1)),
+                         repeat=repeat))
+
+    batch_terms = [term, "energy", "water quality", "privacy", "pipeline"]
+
+    def batch_setup():
+        clear_stored_results(conn)
+        query_opensearch.invalidate_aggregation_cache()
+        query.forget_docket_metadata()
+
+    results.append(bench(f"search_many ({len(batch_terms)} terms)",
+                         lambda: query.search_many([search_params(t, True) for t in batch_terms]),
+                         setup=batch_setup, repeat=repeat))
+
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Run the offline search benchmarks.")
+    arg_parser.add_argument("--dockets", type=int, default=10000, help="number of synthetic dockets")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark")
+    arg_parser.add_argument("--term", default="National", help="search term to benchmark")
+    arg_parser.add_argument("--seed", type=int, default=0, help="corpus seed")
+    arg_parser.add_argument("--json", help="also write the results to this file as JSON")
+    args = arg_parser.parse_args()
+
+    _, fake_client, query = setup_environment(args.dockets, seed=args.seed)
+    results = run_benchmarks(query, fake_client, args.term, args.repeat)
+
+    print(f"{'benchmark':<28}{'min ms':>12}{'median ms':>12}{'mean ms':>12}")
+    for result in results:
+        print(f"{result['name']:<28}{result['min_ms']:>12.2f}{result['median_ms']:>12.2f}{result['mean_ms']:>12.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"dockets": args.dockets, "term": args.term, "results": results}, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import sys
+import types
+
+
+def install(opensearch_client, sql_connect):
+    """
+    Replaces the queries.utils.opensearch and queries.utils.sql modules with stand-ins whose
+    connect() functions return the given OpenSearch client and a local PostgreSQL connection.
+    Must be called before queries.query is imported, since it connects at import time.
+    """
+    if "queries.query" in sys.modules:
+        raise RuntimeError("install() must run before queries.query is imported")
+
+    opensearch_module = types.ModuleType("queries.utils.opensearch")
+    opensearch_module.connect = lambda: opensearch_client
+    sql_module = types.ModuleType("queries.utils.sql")
+    sql_module.connect = sql_connect
+
+    sys.modules["queries.utils.opensearch"] = opensearch_module
+    sys.modules["queries.utils.sql"] = sql_module
@@ -0,0 +1,94 @@
+import random
+import zlib
+from datetime import datetime, timedelta, timezone
+
+WORDS = (
+    "national environmental protection standards emissions safety health federal rule proposed "
+    "amendments energy efficiency water quality air transportation vehicle drug medical device "
+    "food labeling wildlife habitat financial reporting disclosure banking consumer privacy data "
+    "security communications broadband education student loan housing labor wage employment "
+    "agriculture pesticide chemical hazardous waste nuclear reactor aviation pipeline maritime"
+).split()
+
+DOCKET_TYPES = ["Rulemaking", "Nonrulemaking"]
+
+
+def generate_corpus(num_dockets=1000, num_agencies=50, seed=0):
+    """
+    Generates a synthetic corpus shaped like the mirrulations tables and comment indices.
+
+    Parameters:
+        num_dockets (int): Number of dockets to generate (1k to 1M is a sensible range).
+        num_agencies (int): Number of agencies the dockets are spread across.
+        seed (int): Seed for the random generator, so corpora are repeatable.
+
+    Returns:
+        dict: Rows for the "agencies", "dockets", "documents", "abstracts" and "htm_summaries" tables,
+              and per-docket comment counts for the "comments" and "comments_extracted_text" indices.
+    """
+    rng = random.Random(seed)
+    start = datetime(1995, 1, 1, tzinfo=timezone.utc)
+    span_days = (datetime(2025, 1, 1, tzinfo=timezone.utc) - start).days
+
+    agencies = [(f"AG{i:03d}", f"{rng.choice(WORDS).title()} Agency {i}") for i in range(num_agencies)]
+    dockets = []
+    documents = []
+    abstracts = []
+    htm_summaries = []
+    comment_totals = {}
+    attachment_totals = {}
+
+    for i in range(num_dockets):
+        agency_id = agencies[rng.randrange(num_agencies)][0]
+        posted = start + timedelta(days=rng.randrange(span_days))
+        docket_id = f"{agency_id}-{posted.year}-{i:07d}"
+        modify_date = posted + timedelta(days=rng.randrange(365))
+        title = " ".join(rng.choices(WORDS, k=rng.randint(4, 12))).capitalize()
+        docket_abstract = " ".join(rng.choices(WORDS, k=rng.randint(5, 60))) if rng.random() < 0.6 else None
+
+        dockets.append((docket_id, title, modify_date, rng.choice(DOCKET_TYPES), agency_id, docket_abstract))
+
+        for _ in range(rng.randint(1, 4)):
+            opened = posted + timedelta(days=rng.randrange(60))
+            closed = opened + timedelta(days=rng.choice([30, 60, 90])) if rng.random() < 0.9 else None
+            effective = closed + timedelta(days=rng.randrange(180)) if closed and rng.random() < 0.5 else None
+            documents.append((docket_id, posted, opened, closed, effective, closed is None))
+
+        if rng.random() < 0.3:
+            abstracts.append((docket_id, " ".join(rng.choices(WORDS, k=rng.randint(10, 120)))))
+
+        for _ in range(rng.choice([0, 0, 1, 2])):
+            htm_summaries.append((docket_id, " ".join(rng.choices(WORDS, k=rng.randint(20, 200)))))
+
+        total = min(int(rng.paretovariate(1.1) * 5) - 5, 500000)
+        comment_totals[docket_id] = total
+        attachment_totals[docket_id] = int(total * rng.random() * 0.3)
+
+    return {
+        "agencies": agencies,
+        "dockets": dockets,
+        "documents": documents,
+        "abstracts": abstracts,
+        "htm_summaries": htm_summaries,
+        "comments": comment_totals,
+        "comments_extracted_text": attachment_totals,
+    }
+
+
+def matching_count(search_term, index_name, docket_id, total):
+    """
+    Returns a deterministic number of matching documents for a docket, search term and index.
+    Each term has its own match rate and reaches only part of the dockets, so different terms
+    produce differently sized result sets.
+    """
+    if total == 0:
+        return 0
+
+    term_hash = zlib.crc32(f"{search_term.lower()}|{index_name}".encode())
+    coverage = 0.05 + (term_hash % 1000) / 1000 * 0.9
+    rate = 0.01 + (term_hash // 1000 % 1000) / 1000 * 0.5
+
+    u = zlib.crc32(f"{term_hash}|{docket_id}".encode()) / 2 ** 32
+    if u > coverage:
+        return 0
+    return min(total, max(1, int(total * rate * 2 * u / coverage)))
@@ -0,0 +1,123 @@
+import json
+import sys
+from queries.query import append_docket_metadata, filter_dockets, calc_relevance_score
+from queries.utils.encoding import dumps, normalize_docket
+from queries.utils.query_opensearch import iter_docketId_stats
+from queries.utils.sql import connect
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_CHUNK_SIZE = 1000
+
+# Ranks every matching docket in Postgres, skipping dockets with no matching comments or attachments
+# as combine_os_results does; enrichment is left to append_docket_metadata
+EXPORT_QUERY = """
+SELECT docket_id,
+       SUM(total_comments) AS total_comments,
+       SUM(matching_comments) AS matching_comments,
+       SUM(total_attachments) AS total_attachments,
+       SUM(matching_attachments) AS matching_attachments
+FROM export_counts
+GROUP BY docket_id
+HAVING SUM(total_comments) > 0 AND (SUM(matching_comments) > 0 OR SUM(matching_attachments) > 0)
+ORDER BY matching_comments DESC, docket_id
+"""
+
+
+def build_docket(row):
+    """
+    Builds a docket dictionary with its comment and attachment counts from an export row.
+    """
+    docket_id, total_comments, matching_comments, total_attachments, matching_attachments = row
+
+    return {
+        "id": docket_id,
+        "comments": {"match": matching_comments, "total": total_comments},
+        "attachments": {"match": matching_attachments, "total": total_attachments},
+    }
+
+
+def iter_export_lines(search_params, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Streams the full ranked, filtered and enriched result set of a search as NDJSON lines.
+
+    Docket counts are streamed from OpenSearch a page of buckets at a time and copied into a
+    temporary table that Postgres ranks. The ranked rows are read back through a server-side cursor
+    in chunks, and each chunk is enriched with append_docket_metadata, the same code search() uses,
+    so memory use does not grow with the number of matching dockets.
+    The export uses its own database connection so it does not hold the shared one.
+
+    Parameters:
+        search_params (dict): A dictionary with "searchTerm" and "filterParams", as for search().
+        chunk_size (int): Number of buckets and rows fetched per round trip.
+
+    Yields:
+        str: One JSON encoded docket per line, with its "searchRank" and "matchQuality".
+    """
+    searchTerm = search_params["searchTerm"]
+    filterParams = search_params.get("filterParams")
+
+    export_conn = connect()
+
+    try:
+        with export_conn.cursor() as cursor:
+            cursor.execute("""
+            CREATE TEMP TABLE export_counts (
+                docket_id TEXT, total_comments INTEGER, matching_comments INTEGER,
+                total_attachments INTEGER, matching_attachments INTEGER
+            ) ON COMMIT DROP
+            """)
+            with cursor.copy("COPY export_counts FROM STDIN") as copy:
+                for docket_id, total, match in iter_docketId_stats(searchTerm, 'comments', 'commentText', chunk_size):
+                    copy.write_row((docket_id, total, match, 0, 0))
+                for docket_id, total, match in iter_docketId_stats(searchTerm, 'comments_extracted_text', 'extractedText', chunk_size):
+                    copy.write_row((docket_id, 0, 0, total, match))
+
+        rank = 0
+        with export_conn.cursor(name="export_results") as cursor:
+            cursor.execute(EXPORT_QUERY)
+
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+
+                dockets = append_docket_metadata([build_docket(row) for row in rows], export_conn)
+                for docket in filter_dockets(dockets, filterParams):
+                    docket["matchQuality"] = calc_relevance_score(docket)
+                    docket["searchRank"] = rank
+                    rank += 1
+
+                    yield dumps(normalize_docket(docket)) + "\n"
+
+        export_conn.commit()
+
+    except Exception as e:
+        export_conn.rollback()
+        print(f"Error exporting results for search term {searchTerm}")
+        print(e)
+        raise
+
+    finally:
+        export_conn.close()
+
+
+def export_results(search_params, out):
+    """
+    Writes the full ranked result set of a search to a text stream as NDJSON.
+
+    Returns:
+        int: The number of dockets written.
+    """
+    count = 0
+    for line in iter_export_lines(search_params):
+        out.write(line)
+        count += 1
+    return count
+
+
+if __name__ == "__main__":
+    """
+    Exports the results of the search parameters given as a JSON argument to stdout, e.g.
+    python -m queries.export '{"searchTerm": "National", "filterParams": null}'
+    """
+    export_results(json.loads(sys.argv[1]), sys.stdout)
@@ -0,0 +1,22 @@
+-- Records when each stored result set was computed and the modify_date of each stored docket at that time,
+-- and for approximate result sets, the sampling details and the error of each stored docket's estimate.
+-- Incremental refreshes ("refreshMode": "incremental") read it to find the dockets that changed since.
+CREATE TABLE IF NOT EXISTS stored_results_refresh (
+    search_term TEXT,
+    session_id TEXT,
+    sort_asc BOOLEAN,
+    sort_type TEXT,
+    filter_agencies TEXT,
+    filter_date_start TEXT,
+    filter_date_end TEXT,
+    filter_rulemaking TEXT,
+    computed_at TIMESTAMPTZ,
+    modify_dates JSONB,
+    approximation JSONB
+);
+
+CREATE INDEX IF NOT EXISTS stored_results_refresh_key
+    ON stored_results_refresh (search_term, session_id);
+
+-- Marks stored results of approximate searches, so page reads only look up the approximation for those.
+ALTER TABLE stored_results ADD COLUMN IF NOT EXISTS approximate BOOLEAN NOT NULL DEFAULT FALSE;
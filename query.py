@@ -1,14 +1,63 @@
 import json
+import threading
+import time
+from collections import OrderedDict
+from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 from math import exp
 from dateutil import parser as date_parser
-from datetime import datetime, timezone
-from queries.utils.query_opensearch import query_OpenSearch
-from queries.utils.query_sql import append_docket_fields, append_agency_fields, append_document_dates, append_summary
+from datetime import datetime, timedelta, timezone
+from queries.utils.query_opensearch import INDEXING_LAG_SECONDS, query_OpenSearch, query_OpenSearch_sampled, query_changed_dockets, cached_query_OpenSearch, cached_msearch_OpenSearch, cached_docket_totals, peek_docket_totals, peek_cached_query_OpenSearch
+from queries.utils.query_sql import append_docket_fields, append_agency_fields, append_document_dates, append_summary, get_modify_dates
 from queries.utils.sql import connect
+from queries.utils.timing import stage, report_error
+from queries.utils.encoding import encode_response
 
 
 conn = connect()
 
+# Pages enriched ahead of the user's next click, keyed by page_cache_key().
+# Entries expire after PREFETCH_TTL_SECONDS so stale enrichment is never served for long.
+# Each refresh of a search term and session starts a new generation; pages built for an older one are dropped.
+# Prefetch threads read through their own connections, kept in prefetch_local.
+PREFETCH_TTL_SECONDS = 120
+PREFETCH_SORT_TYPES = ['dateModified', 'alphaByTitle', 'relevance']
+prefetch_cache = {}
+prefetch_generations = {}
+prefetch_lock = threading.Lock()
+prefetch_local = threading.local()
+prefetch_executor = ThreadPoolExecutor(max_workers=2)
+
+# Dockets per page and pages per stored result set; a result set stores PER_PAGE * PAGES dockets
+PER_PAGE = 10
+PAGES = 10
+
+# Incremental refreshes recount at most this many changed dockets before falling back to a full refresh
+INCREMENTAL_MAX_CHANGED = 10000
+
+# Options search_many() leaves to search() instead of batching
+SEARCH_ONLY_OPTIONS = ("rankedQuery", "approximate", "prefetch")
+
+# Ranked queries ask OpenSearch for totalResults * RANKED_OVERFETCH dockets to leave room for filtering
+RANKED_OVERFETCH = 3
+
+# Approximate searches sample roughly APPROXIMATE_DOCS_PER_MS matches per shard per millisecond of budget
+APPROXIMATE_LATENCY_BUDGET_MS = 5000
+APPROXIMATE_DOCS_PER_MS = 20
+APPROXIMATE_MIN_SAMPLE = 1000
+# Indexes whose docket totals are being counted in the background, so approximate searches never wait on them
+totals_pending = set()
+
+# Enriched docket fields, keyed by docket id, reused by page reads until they expire or are evicted;
+# full refreshes always read them from the database and replace the cached copy.
+# Entries are (created, fields, has_summary); entries enriched without the summary only serve requests that skip it
+DOCKET_METADATA_TTL_SECONDS = 3600
+DOCKET_METADATA_MAX_ENTRIES = 100000
+DOCKET_METADATA_FIELDS = ("title", "timelineDates", "docketType", "agencyID", "agencyName",
+                          "isOpenForComment", "summary")
+docket_metadata_cache = OrderedDict()
+docket_metadata_lock = threading.Lock()
+
 def filter_dockets(dockets, filter_params=None):
     """
     Filters a list of dockets based on the provided filter parameters.
@@ -129,10 +178,11 @@ def drop_previous_results(searchTerm, sessionID, sortParams, filterParams):
     except Exception as e:
         print(f"Error deleting previous results for search term {searchTerm}")
         print(e)
+        report_error("drop_previous_results", e)
 
     conn.commit()
 
-def storeDockets(dockets, searchTerm, sessionID, sortParams, filterParams, totalResults):
+def storeDockets(dockets, searchTerm, sessionID, sortParams, filterParams, totalResults, approximate=False):
     """
     Stores the search results (dockets) into the database.
 
@@ -143,6 +193,7 @@ def storeDockets(dockets, searchTerm, sessionID, sortParams, filterParams, total
         sortParams (dict): Sorting parameters.
         filterParams (dict): Filtering parameters.
         totalResults (int): The total number of results to store.
+        approximate (bool): Whether the match counts are estimates from an approximate search.
 
     Returns:
         None
@@ -162,7 +213,8 @@ def storeDockets(dockets, searchTerm, sessionID, sortParams, filterParams, total
             dockets[i]["id"],
             dockets[i]["comments"]["total"],
             dockets[i]["comments"]["match"],
-            dockets[i]["matchQuality"]
+            dockets[i]["matchQuality"],
+            approximate
         )
 
         # Insert into the database
@@ -172,17 +224,18 @@ def storeDockets(dockets, searchTerm, sessionID, sortParams, filterParams, total
                 INSERT INTO stored_results (
                     search_term, session_id, sort_asc, sort_type, filter_agencies, filter_date_start,
                     filter_date_end, filter_rulemaking, search_rank, docket_id, total_comments, matching_comments,
-                    relevance_score
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
+                    relevance_score, approximate
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
                 """
                 cursor.execute(insert_query, values)
         except Exception as e:
             print(f"Error inserting docket {dockets[i]['id']}")
             print(e)
+            report_error("storeDockets", e)
 
     conn.commit()
 
-def getSavedResults(searchTerm, sessionID, sortParams, filterParams):
+def getSavedResults(searchTerm, sessionID, sortParams, filterParams, db_conn=None):
     """
     Retrieves previously stored search results from the database.
 
@@ -191,15 +244,19 @@ def getSavedResults(searchTerm, sessionID, sortParams, filterParams):
         sessionID (str): The session ID for the current search.
         sortParams (dict): Sorting parameters.
         filterParams (dict): Filtering parameters.
+        db_conn: The connection to read from; defaults to the shared connection.
 
     Returns:
-        list: A list of saved docket results from the database.
+        list: A list of saved docket results from the database, each (search_rank, docket_id, total_comments,
+              matching_comments, relevance_score, approximate).
     """    
 
+    db_conn = db_conn if db_conn is not None else conn
     try:
-        with conn.cursor() as cursor:
+        with db_conn.cursor() as cursor:
             select_query = """
-            SELECT search_rank, docket_id, total_comments, matching_comments, relevance_score FROM stored_results
+            SELECT search_rank, docket_id, total_comments, matching_comments, relevance_score, approximate
+            FROM stored_results
             WHERE search_term = %s AND session_id = %s AND sort_asc = %s AND sort_type = %s AND filter_agencies = %s
             AND filter_date_start = %s AND filter_date_end = %s AND filter_rulemaking = %s
             """
@@ -210,6 +267,7 @@ def getSavedResults(searchTerm, sessionID, sortParams, filterParams):
     except Exception as e:
         print(f"Error retrieving dockets for search term {searchTerm}")
         print(e)
+        report_error("getSavedResults", e)
 
     return dockets
 
@@ -219,7 +277,8 @@ def calc_relevance_score(docket):
     Calculates relevance score as: total_comments * (ratio ** 2) * decay.
     """
     try:
-        total_comments = docket.get("comments", {}).get("total", 0)
+        # Approximate results leave the total unknown until the index's docket totals are counted
+        total_comments = docket.get("comments", {}).get("total") or 0
         matching_comments = docket.get("comments", {}).get("match", 0)
         ratio = matching_comments / total_comments if total_comments > 0 else 0
         modify_date = date_parser.isoparse(docket.get("timelineDates", {}).get("dateModified", "1970-01-01T00:00:00Z"))
@@ -231,6 +290,638 @@ def calc_relevance_score(docket):
         print(f"Error calculating relevance score for docket {docket.get('id', 'unknown')}: {e}")
         return 0
 
+def result_set_params(searchTerm, sessionID, sortParams, filterParams):
+    """
+    Returns the column values that identify a stored result set, in the order used by the
+    stored_results and stored_results_refresh tables.
+    """
+    return (searchTerm, sessionID, sortParams["desc"], sortParams["sortType"],
+            ",".join(sorted(filterParams["agencies"])) if filterParams["agencies"] else '',
+            filterParams["dateRange"]["start"], filterParams["dateRange"]["end"], filterParams["docketType"])
+
+def record_refresh_time(searchTerm, sessionID, sortParams, filterParams, computed_at, docket_ids, approximation=None):
+    """
+    Records the time a stored result set was computed and the current modify_date of each stored docket,
+    replacing any earlier record. The stored_results_refresh table is created by
+    migrations/stored_results_refresh.sql.
+    For approximate result sets, approximation holds the response's "approximate" dictionary and the
+    "errors" of the stored dockets' estimated comment matches, so pages read later still report them.
+    The time is recorded INDEXING_LAG_SECONDS early, so the next incremental refresh also rechecks
+    documents that were stamped before computed_at but not yet searchable.
+    """
+    key = result_set_params(searchTerm, sessionID, sortParams, filterParams)
+    try:
+        modify_dates = get_modify_dates(docket_ids, conn)
+        with conn.cursor() as cursor:
+            cursor.execute("""
+            DELETE FROM stored_results_refresh
+            WHERE search_term = %s AND session_id = %s AND sort_asc = %s AND sort_type = %s
+            AND filter_agencies = %s AND filter_date_start = %s AND filter_date_end = %s AND filter_rulemaking = %s
+            """, key)
+            cursor.execute("""
+            INSERT INTO stored_results_refresh (
+                search_term, session_id, sort_asc, sort_type, filter_agencies, filter_date_start,
+                filter_date_end, filter_rulemaking, computed_at, modify_dates, approximation
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb, %s::jsonb)
+            """, key + (computed_at - timedelta(seconds=INDEXING_LAG_SECONDS), json.dumps(modify_dates),
+                        json.dumps(approximation) if approximation is not None else None))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"Error recording refresh time for search term {searchTerm}")
+        print(e)
+        report_error("record_refresh_time", e)
+
+def get_refresh_time(searchTerm, sessionID, sortParams, filterParams, db_conn=None):
+    """
+    Returns the time a stored result set was computed, the modify_date of each of its dockets at that time
+    and its approximation (None for exact result sets), or None if it has never been recorded.
+    The database is read through db_conn, or the shared connection if it is None.
+    """
+    db_conn = db_conn if db_conn is not None else conn
+    try:
+        with db_conn.cursor() as cursor:
+            cursor.execute("""
+            SELECT computed_at, modify_dates, approximation FROM stored_results_refresh
+            WHERE search_term = %s AND session_id = %s AND sort_asc = %s AND sort_type = %s
+            AND filter_agencies = %s AND filter_date_start = %s AND filter_date_end = %s AND filter_rulemaking = %s
+            """, result_set_params(searchTerm, sessionID, sortParams, filterParams))
+            row = cursor.fetchone()
+    except Exception as e:
+        db_conn.rollback()
+        print(f"Error retrieving refresh time for search term {searchTerm}")
+        print(e)
+        report_error("get_refresh_time", e)
+        return None
+
+    return tuple(row) if row else None
+
+def rewrite_ranks(old_rows, ranking, searchTerm, sessionID, sortParams, filterParams):
+    """
+    Rewrites only the stored ranks whose docket or counts differ between the old rows and the new ranking.
+
+    Parameters:
+        old_rows (list): Rows from getSavedResults (search_rank, docket_id, total, match, score, approximate).
+        ranking (list): The new ordered list of docket dictionaries.
+
+    Returns:
+        int: The number of ranks rewritten.
+    """
+    key = result_set_params(searchTerm, sessionID, sortParams, filterParams)
+    old_by_rank = {row[0]: tuple(row[1:5]) for row in old_rows}
+    new_by_rank = {
+        i: (docket["id"], docket["comments"]["total"], docket["comments"]["match"], docket["matchQuality"])
+        for i, docket in enumerate(ranking)
+    }
+
+    affected = sorted(rank for rank in set(old_by_rank) | set(new_by_rank)
+                      if old_by_rank.get(rank) != new_by_rank.get(rank))
+    if not affected:
+        return 0
+
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+            DELETE FROM stored_results
+            WHERE search_term = %s AND session_id = %s AND sort_asc = %s AND sort_type = %s
+            AND filter_agencies = %s AND filter_date_start = %s AND filter_date_end = %s AND filter_rulemaking = %s
+            AND search_rank = ANY(%s)
+            """, key + (affected,))
+            cursor.executemany("""
+            INSERT INTO stored_results (
+                search_term, session_id, sort_asc, sort_type, filter_agencies, filter_date_start,
+                filter_date_end, filter_rulemaking, search_rank, docket_id, total_comments, matching_comments,
+                relevance_score
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
+            """, [key + (rank,) + new_by_rank[rank] for rank in affected if rank in new_by_rank])
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"Error rewriting ranks for search term {searchTerm}")
+        print(e)
+        raise
+
+    return len(affected)
+
+def store_result_sets(result_sets, totalResults, computed_at):
+    """
+    Replaces several stored result sets and their refresh times in a single transaction.
+
+    Parameters:
+        result_sets (list): (searchTerm, sessionID, sortParams, filterParams, ranking) tuples.
+        totalResults (int): The maximum number of dockets to store per result set.
+        computed_at (datetime): The time the result sets were computed; it is recorded
+            INDEXING_LAG_SECONDS early, as in record_refresh_time.
+    """
+    result_rows = []
+    refresh_rows = []
+    recorded_at = computed_at - timedelta(seconds=INDEXING_LAG_SECONDS)
+
+    try:
+        modify_dates = get_modify_dates(
+            {docket["id"] for _, _, _, _, ranking in result_sets for docket in ranking[:totalResults]}, conn)
+        with conn.cursor() as cursor:
+            for searchTerm, sessionID, sortParams, filterParams, ranking in result_sets:
+                key = result_set_params(searchTerm, sessionID, sortParams, filterParams)
+                cursor.execute("""
+                DELETE FROM stored_results
+                WHERE search_term = %s AND session_id = %s AND sort_asc = %s AND sort_type = %s
+                AND filter_agencies = %s AND filter_date_start = %s AND filter_date_end = %s AND filter_rulemaking = %s
+                """, key)
+                cursor.execute("""
+                DELETE FROM stored_results_refresh
+                WHERE search_term = %s AND session_id = %s AND sort_asc = %s AND sort_type = %s
+                AND filter_agencies = %s AND filter_date_start = %s AND filter_date_end = %s AND filter_rulemaking = %s
+                """, key)
+
+                for i, docket in enumerate(ranking[:totalResults]):
+                    result_rows.append(key + (i, docket["id"], docket["comments"]["total"],
+                                              docket["comments"]["match"], docket["matchQuality"]))
+                refresh_rows.append(key + (recorded_at, json.dumps(
+                    {docket["id"]: modify_dates.get(docket["id"]) for docket in ranking[:totalResults]})))
+
+            cursor.executemany("""
+            INSERT INTO stored_results (
+                search_term, session_id, sort_asc, sort_type, filter_agencies, filter_date_start,
+                filter_date_end, filter_rulemaking, search_rank, docket_id, total_comments, matching_comments,
+                relevance_score
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
+            """, result_rows)
+            cursor.executemany("""
+            INSERT INTO stored_results_refresh (
+                search_term, session_id, sort_asc, sort_type, filter_agencies, filter_date_start,
+                filter_date_end, filter_rulemaking, computed_at, modify_dates
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb)
+            """, refresh_rows)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print("Error storing batched search results")
+        print(e)
+        raise
+
+def combine_os_results(comment_results, attachment_results):
+    """
+    Combines comment and attachment aggregation results into a list of dockets,
+    skipping dockets with no matching comments or attachments.
+    """
+    os_results = []
+
+    for docket in comment_results:
+        matching_comments = comment_results.get(docket, {}).get("match", 0)
+        total_comments = comment_results.get(docket, {}).get("total", 0)
+        matching_attachments = attachment_results.get(docket, {}).get("match", 0)
+        total_attachments = attachment_results.get(docket, {}).get("total", 0)
+        if matching_comments == 0 and matching_attachments == 0:
+            continue
+        combined = {
+            "id": docket,
+            "comments": {
+                "match": matching_comments,
+                "total": total_comments,
+            },
+            "attachments": {
+                "match": matching_attachments,
+                "total": total_attachments,
+            },
+        }
+        # Approximate results carry the error bound of the estimated match counts
+        if "error" in comment_results.get(docket, {}):
+            combined["comments"]["error"] = comment_results[docket]["error"]
+        if "error" in attachment_results.get(docket, {}):
+            combined["attachments"]["error"] = attachment_results[docket]["error"]
+        os_results.append(combined)
+
+    return os_results
+
+def fetch_os_results(searchTerm, top_n=None):
+    """
+    Runs the comment and attachment aggregations for a search term through the aggregation cache
+    and combines them.
+    With top_n, only the top_n dockets by matching comments and the top_n dockets by matching
+    attachments are fetched, and each aggregation is then completed for the dockets found by the other.
+
+    Returns:
+        tuple: The combined list of dockets, whether the ranked query may have cut off matching dockets,
+               and the time of the oldest aggregation used, which is earlier than now for cached ones.
+    """
+    if top_n is None:
+        with stage("opensearch"):
+            comment_results, comments_at = cached_query_OpenSearch(searchTerm, 'comments', 'commentText')
+            attachment_results, attachments_at = cached_query_OpenSearch(searchTerm, 'comments_extracted_text', 'extractedText')
+        return combine_os_results(comment_results, attachment_results), False, min(comments_at, attachments_at)
+
+    with stage("opensearch"):
+        ranked_comments, comments_at = cached_query_OpenSearch(searchTerm, 'comments', 'commentText', top_n=top_n)
+        ranked_attachments, attachments_at = cached_query_OpenSearch(searchTerm, 'comments_extracted_text', 'extractedText', top_n=top_n)
+
+        # Dockets that only match in their attachments are missing from the ranked comment buckets
+        comment_results = dict(ranked_comments)
+        attachment_only = [docket_id for docket_id, counts in ranked_attachments.items()
+                           if counts["match"] > 0 and docket_id not in comment_results]
+        if attachment_only:
+            comment_results.update(query_OpenSearch(searchTerm, 'comments', 'commentText', docket_ids=attachment_only))
+
+        attachment_results = query_OpenSearch(searchTerm, 'comments_extracted_text', 'extractedText',
+                                              docket_ids=list(comment_results))
+
+    # Either ranking may have stopped before its last matching docket
+    truncated = any(
+        len(ranked) >= top_n and all(counts["match"] > 0 for counts in ranked.values())
+        for ranked in (ranked_comments, ranked_attachments)
+    )
+    return combine_os_results(comment_results, attachment_results), truncated, min(comments_at, attachments_at)
+
+def count_docket_totals(index_name):
+    """
+    Counts and caches the docket totals of an index in the background for later approximate searches.
+    """
+    try:
+        cached_docket_totals(index_name)
+    except Exception as e:
+        print(f"Error counting docket totals of {index_name}: {e}")
+        report_error("count_docket_totals", e)
+    finally:
+        with prefetch_lock:
+            totals_pending.discard(index_name)
+
+def fetch_approximate_os_results(searchTerm, latency_budget_ms):
+    """
+    Runs sampled comment and attachment aggregations sized to fit the latency budget and combines them.
+    Both indexes are queried at the same time, each with the whole budget as its timeout, and an index
+    whose exhaustive aggregation is already cached is answered exactly from the cache instead.
+    Docket totals are only used if already known; otherwise they are counted in the background and
+    the index's totals are left unknown, flagged by "totalsKnown".
+
+    Returns:
+        tuple: The combined list of dockets with estimated match counts, a dictionary describing
+               the approximation of each index, and the time of the oldest aggregation used.
+    """
+    sample_size = max(APPROXIMATE_MIN_SAMPLE, int(latency_budget_ms * APPROXIMATE_DOCS_PER_MS))
+
+    def sample(index_name, field_name):
+        exact = peek_cached_query_OpenSearch(searchTerm, index_name, field_name)
+        if exact is not None:
+            return exact[0], {"sampleRatio": 1.0, "timedOut": False, "totalsKnown": True}, exact[1]
+        totals = peek_docket_totals(index_name)
+        if totals is None:
+            with prefetch_lock:
+                start = index_name not in totals_pending
+                totals_pending.add(index_name)
+            if start:
+                prefetch_executor.submit(count_docket_totals, index_name)
+        computed_at = datetime.now(timezone.utc)
+        results, meta = query_OpenSearch_sampled(searchTerm, index_name, field_name, sample_size,
+                                                 totals, timeout_ms=latency_budget_ms)
+        return results, meta, computed_at
+
+    with stage("opensearch"):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            comments = executor.submit(sample, 'comments', 'commentText')
+            attachments = executor.submit(sample, 'comments_extracted_text', 'extractedText')
+            comment_results, comment_meta, comments_at = comments.result()
+            attachment_results, attachment_meta, attachments_at = attachments.result()
+
+    approximation = {"comments": comment_meta, "attachments": attachment_meta}
+    return combine_os_results(comment_results, attachment_results), approximation, min(comments_at, attachments_at)
+
+def append_docket_metadata(dockets, db_conn=None, include_summary=True):
+    """
+    Appends docket, agency, document date and summary fields to the dockets with the append_* functions,
+    dropping dockets missing from the dockets table. Every enriched docket, in searches and exports, goes through here.
+    Without include_summary, the summary is not read.
+    """
+    db_conn = db_conn if db_conn is not None else conn
+    dockets = append_docket_fields(dockets, db_conn)
+    dockets = append_agency_fields(dockets, db_conn)
+    dockets = append_document_dates(dockets, db_conn)
+    if not include_summary:
+        return dockets
+    return append_summary(dockets, db_conn)
+
+def enrich_dockets(dockets, db_conn=None, refresh=False, include_summary=True):
+    """
+    Appends docket, agency, document date and summary fields to the dockets, taking them from the
+    docket metadata cache where possible and querying the database only for the other dockets.
+    With refresh, every docket is read from the database and its cache entry replaced, so refreshed
+    results never carry stale metadata. Cached fields are copied, never shared between responses.
+    Dockets missing from the dockets table are dropped, as in append_docket_fields.
+    Without include_summary, the summary is neither read nor required of cache entries.
+    The database is read through db_conn, or the shared connection if it is None.
+    """
+    db_conn = db_conn if db_conn is not None else conn
+    now = time.monotonic()
+    cached = {}
+    with docket_metadata_lock:
+        for docket in dockets if not refresh else []:
+            entry = docket_metadata_cache.get(docket["id"])
+            if (entry is not None and now - entry[0] < DOCKET_METADATA_TTL_SECONDS
+                    and (entry[2] or not include_summary)):
+                docket_metadata_cache.move_to_end(docket["id"])
+                cached[docket["id"]] = entry[1]
+
+    missing = [docket for docket in dockets if docket["id"] not in cached]
+    found = set()
+    if missing:
+        missing = append_docket_metadata(missing, db_conn, include_summary)
+
+        with docket_metadata_lock:
+            for docket in missing:
+                found.add(docket["id"])
+                fields = {field: docket[field] for field in DOCKET_METADATA_FIELDS if field in docket}
+                docket_metadata_cache[docket["id"]] = (now, deepcopy(fields), include_summary)
+                docket_metadata_cache.move_to_end(docket["id"])
+            while len(docket_metadata_cache) > DOCKET_METADATA_MAX_ENTRIES:
+                docket_metadata_cache.popitem(last=False)
+
+    enriched = []
+    for docket in dockets:
+        if docket["id"] in cached:
+            docket.update(deepcopy(cached[docket["id"]]))
+            enriched.append(docket)
+        elif docket["id"] in found:
+            enriched.append(docket)
+
+    return enriched
+
+def forget_docket_metadata(docket_ids=None):
+    """
+    Removes dockets from the docket metadata cache so their fields are read from the database again.
+    If docket_ids is None, the whole cache is cleared.
+    """
+    with docket_metadata_lock:
+        if docket_ids is None:
+            docket_metadata_cache.clear()
+            return
+        for docket_id in docket_ids:
+            docket_metadata_cache.pop(docket_id, None)
+
+def enrich_and_score(os_results, filterParams, refresh=False, include_summary=True):
+    """
+    Appends docket, agency, document date and summary fields to the dockets,
+    applies the filters and sets each docket's matchQuality.
+    With refresh, the docket metadata cache is bypassed and updated, and without include_summary
+    the summary is skipped, as in enrich_dockets.
+    """
+    with stage("enrichment"):
+        results = enrich_dockets(os_results, refresh=refresh, include_summary=include_summary)
+
+    with stage("filter_score"):
+        results = filter_dockets(results, filterParams)
+
+        for docket in results:
+            docket["matchQuality"] = calc_relevance_score(docket)
+
+    return results
+
+def incremental_refresh(searchTerm, sessionID, sortParams, filterParams, totalResults):
+    """
+    Updates a stored result set using only the dockets that changed since it was computed:
+    dockets with comments or attachments indexed since then and stored dockets whose modify_date
+    differs from the one recorded with the result set.
+    Their counts are recomputed and merged into the stored ranking, and only the affected ranks are rewritten.
+    Dockets outside the stored ranking are only reconsidered when new comments or attachments are indexed for them.
+
+    Returns:
+        list: The new ranking, or None if a full refresh is needed instead (no recorded computation, an
+              approximate result set, no indexed-at field mapping, too many changed dockets, or changed dockets fell below dockets
+              that were never stored).
+    """
+    record = get_refresh_time(searchTerm, sessionID, sortParams, filterParams)
+    # Estimated counts cannot be merged with exact recounts, so approximate result sets are recomputed in full
+    if record is None or record[1] is None or record[2] is not None:
+        return None
+    computed_at, modify_dates, _ = record
+
+    refreshed_at = datetime.now(timezone.utc)
+
+    with stage("change_detection"):
+        try:
+            changed = query_changed_dockets('comments', computed_at)
+            changed |= query_changed_dockets('comments_extracted_text', computed_at)
+        except ValueError as e:
+            # Without the indexed-at field new comments cannot be found, so recompute from scratch
+            print(f"Incremental refresh unavailable for search term {searchTerm}")
+            print(e)
+            report_error("incremental_refresh", e)
+            return None
+        current_modify_dates = get_modify_dates(list(modify_dates), conn)
+        changed |= {docket_id for docket_id, modify_date in modify_dates.items()
+                    if current_modify_dates.get(docket_id) != modify_date}
+
+    if len(changed) > INCREMENTAL_MAX_CHANGED:
+        return None
+
+    with stage("saved_results"):
+        old_rows = getSavedResults(searchTerm, sessionID, sortParams, filterParams)
+
+    merged = {}
+    for row in old_rows:
+        if row[1] in changed:
+            continue
+        merged[row[1]] = {
+            "id": row[1],
+            "comments": {"match": row[3], "total": row[2]},
+            "matchQuality": row[4],
+        }
+
+    if changed:
+        forget_docket_metadata(changed)
+        docket_ids = sorted(changed)
+        with stage("opensearch"):
+            comment_results = query_OpenSearch(searchTerm, 'comments', 'commentText', docket_ids=docket_ids)
+            attachment_results = query_OpenSearch(searchTerm, 'comments_extracted_text', 'extractedText', docket_ids=docket_ids)
+        for docket in enrich_and_score(combine_os_results(comment_results, attachment_results), filterParams):
+            merged[docket["id"]] = docket
+
+    ranking = sorted(merged.values(), key=lambda x: x.get("comments").get("match"), reverse=True)[:totalResults]
+
+    # Dockets ranked below the stored ones were never stored, so the merged ranking is only complete
+    # down to the lowest stored count; if a changed docket fell below it, recompute from scratch
+    if len(old_rows) >= totalResults:
+        floor = min(row[3] for row in old_rows)
+        if sum(1 for docket in ranking if docket["comments"]["match"] >= floor) < totalResults:
+            return None
+
+    with stage("store"):
+        rewrite_ranks(old_rows, ranking, searchTerm, sessionID, sortParams, filterParams)
+        record_refresh_time(searchTerm, sessionID, sortParams, filterParams, refreshed_at,
+                            [docket["id"] for docket in ranking])
+
+    return ranking
+
+def page_cache_key(searchTerm, sessionID, sortParams, filterParams, pageNumber):
+    """
+    Builds the key used to look up a prefetched page in the prefetch cache.
+    """
+    return json.dumps([searchTerm, sessionID, sortParams, filterParams, pageNumber], sort_keys=True)
+
+def clear_prefetched_pages(searchTerm, sessionID):
+    """
+    Removes every prefetched page for a search term and session, e.g. after its stored results are refreshed,
+    and moves the search term and session to a new prefetch generation so pages still being built from
+    the old stored results are discarded instead of cached.
+    """
+    with prefetch_lock:
+        prefetch_generations[(searchTerm, sessionID)] = prefetch_generations.get((searchTerm, sessionID), 0) + 1
+        for key in list(prefetch_cache):
+            term, session = json.loads(key)[:2]
+            if term == searchTerm and session == sessionID:
+                del prefetch_cache[key]
+
+def build_saved_page(searchTerm, sessionID, sortParams, filterParams, pageNumber, perPage, pages, db_conn=None,
+                     include_summary=True):
+    """
+    Reads one page of stored results from the database and enriches it with docket, agency,
+    document date and, with include_summary, summary fields. Pages of approximate result sets carry
+    the stored approximation. The database is read through db_conn, or the shared connection if it is None.
+
+    Returns:
+        dict: A dictionary with "currentPage", "totalPages" and "dockets".
+    """
+    with stage("saved_results"):
+        dockets_raw = getSavedResults(searchTerm, sessionID, sortParams, filterParams, db_conn)
+    dockets = []
+    for d in dockets_raw:
+        dockets.append(
+            {
+                "searchRank": d[0],
+                "id": d[1],
+                "comments": {"match": d[3], "total": d[2]},
+                "matchQuality": d[4],
+            }
+        )
+    dockets = sorted(dockets, key=lambda x: x["searchRank"])
+    dockets = dockets[perPage * pageNumber : perPage * (pageNumber + 1)]
+
+    count_dockets = len(dockets)
+    
+    count_pages = count_dockets // perPage
+    if count_dockets % perPage:
+        count_pages += 1
+
+    count_pages = min(count_pages, pages)
+
+    with stage("enrichment"):
+        dockets = enrich_dockets(dockets, db_conn, include_summary=include_summary)
+
+    ret = {"currentPage": pageNumber, "totalPages": count_pages, "dockets": dockets}
+
+    # Only approximate result sets need their stored approximation, so exact pages skip the lookup
+    approximate = any(d[5] for d in dockets_raw)
+    record = get_refresh_time(searchTerm, sessionID, sortParams, filterParams, db_conn) if approximate else None
+    if record is not None and record[2] is not None:
+        approximation = record[2]
+        ret["approximate"] = {"comments": approximation["comments"], "attachments": approximation["attachments"]}
+        for docket in dockets:
+            docket["comments"]["error"] = approximation["errors"].get(docket["id"])
+
+    return ret
+
+def get_cached_page(searchTerm, sessionID, sortParams, filterParams, pageNumber, perPage, pages,
+                    include_summary=True):
+    """
+    Returns a page of stored results, serving it from the prefetch cache when a fresh copy exists
+    and building it from the database otherwise, with the summary only if include_summary.
+    """
+    key = page_cache_key(searchTerm, sessionID, sortParams, filterParams, pageNumber)
+    with prefetch_lock:
+        entry = prefetch_cache.pop(key, None)
+    if entry is not None and time.monotonic() - entry[0] < PREFETCH_TTL_SECONDS:
+        return entry[1]
+
+    return build_saved_page(searchTerm, sessionID, sortParams, filterParams, pageNumber, perPage, pages,
+                            include_summary=include_summary)
+
+def get_prefetch_conn():
+    """
+    Returns the database connection of the current prefetch thread, opening it on first use.
+    Prefetching never uses the shared connection, so a failed prefetch cannot abort a search's transaction.
+    """
+    db_conn = getattr(prefetch_local, "conn", None)
+    if db_conn is None or db_conn.closed:
+        db_conn = connect()
+        prefetch_local.conn = db_conn
+    return db_conn
+
+def prefetch_page(searchTerm, sessionID, sortParams, filterParams, pageNumber, perPage, pages, generation):
+    """
+    Builds a page in the background on the prefetch thread's own connection and stores it in the prefetch cache.
+    Pages with no stored dockets are not cached, nor are pages whose search term and session were
+    refreshed after generation was read, since they may hold the old stored results.
+    """
+    key = page_cache_key(searchTerm, sessionID, sortParams, filterParams, pageNumber)
+    with prefetch_lock:
+        entry = prefetch_cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < PREFETCH_TTL_SECONDS:
+            return
+
+    db_conn = get_prefetch_conn()
+    try:
+        page = build_saved_page(searchTerm, sessionID, sortParams, filterParams, pageNumber, perPage, pages, db_conn)
+        db_conn.commit()
+    except Exception as e:
+        db_conn.rollback()
+        print(f"Error prefetching page {pageNumber} for search term {searchTerm}")
+        print(e)
+        report_error("prefetch_page", e)
+        return
+
+    if not page["dockets"]:
+        return
+
+    with prefetch_lock:
+        if prefetch_generations.get((searchTerm, sessionID), 0) != generation:
+            return
+        now = time.monotonic()
+        for stale_key in [k for k, (created, _) in prefetch_cache.items() if now - created >= PREFETCH_TTL_SECONDS]:
+            del prefetch_cache[stale_key]
+        prefetch_cache[key] = (now, page)
+
+def prefetch_other_sort_orders(searchTerm, sessionID, sortParams, filterParams, perPage, pages, generation):
+    """
+    Prefetches the first page of each other sort order that already has a stored result set.
+    A single query finds those sort orders, so no work is spent on result sets that were never computed.
+    """
+    key = result_set_params(searchTerm, sessionID, sortParams, filterParams)
+    db_conn = get_prefetch_conn()
+    try:
+        with db_conn.cursor() as cursor:
+            cursor.execute("""
+            SELECT DISTINCT sort_type FROM stored_results
+            WHERE search_term = %s AND session_id = %s AND sort_asc = %s
+            AND filter_agencies = %s AND filter_date_start = %s AND filter_date_end = %s AND filter_rulemaking = %s
+            """, key[:3] + key[4:])
+            stored_sort_types = {row[0] for row in cursor.fetchall()}
+        db_conn.commit()
+    except Exception as e:
+        db_conn.rollback()
+        print(f"Error finding stored sort orders for search term {searchTerm}")
+        print(e)
+        report_error("prefetch_other_sort_orders", e)
+        return
+
+    for sort_type in PREFETCH_SORT_TYPES:
+        if sort_type == sortParams["sortType"] or sort_type not in stored_sort_types:
+            continue
+        other_sort = dict(sortParams, sortType=sort_type)
+        prefetch_page(searchTerm, sessionID, other_sort, filterParams, 0, perPage, pages, generation)
+
+def schedule_prefetch(searchTerm, sessionID, sortParams, filterParams, pageNumber, perPage, pages):
+    """
+    Queues background enrichment of the page after pageNumber and of the first page of the
+    other stored sort orders, so the user's next click can be served from memory.
+    """
+    with prefetch_lock:
+        generation = prefetch_generations.get((searchTerm, sessionID), 0)
+
+    if pageNumber + 1 < pages:
+        prefetch_executor.submit(prefetch_page, searchTerm, sessionID, sortParams, filterParams,
+                                 pageNumber + 1, perPage, pages, generation)
+
+    prefetch_executor.submit(prefetch_other_sort_orders, searchTerm, sessionID, sortParams, filterParams,
+                             perPage, pages, generation)
+
 def search(search_params):
     """
     Executes a search query, processes the results, and returns paginated data.
@@ -240,15 +931,33 @@ def search(search_params):
             - "searchTerm" (str): The term to search for.
             - "pageNumber" (int): The page number for pagination.
             - "refreshResults" (bool): Whether to refresh results or use cached data.
+            - "refreshMode" (str, optional): "full" (default) recomputes the stored results from scratch;
+              "incremental" only recounts dockets that changed since the results were last computed.
+            - "rankedQuery" (bool, optional): Whether OpenSearch should return only the top dockets by
+              matching comments instead of every docket.
+            - "overfetch" (int, optional): How many times totalResults a ranked query requests.
+            - "approximate" (bool, optional): Whether to estimate match counts from a sample of the
+              matching documents, for very broad search terms.
+            - "latencyBudgetMs" (int, optional): Time budget of an approximate search, which sets the
+              sample size and the OpenSearch timeout of the comment and attachment queries, run concurrently.
+            - "fields" (list, optional): Docket fields to include in the response, e.g. ["id", "title", "comments"].
+            - "compression" (str, optional): "gzip" or "br" to compress the encoded response.
             - "sessionID" (str): The session ID for the current search.
             - "sortParams" (dict): Sorting parameters.
             - "filterParams" (dict): Filtering parameters.
+            - "prefetch" (bool, optional): Whether to enrich the next page and the first page of the
+              other stored sort orders in the background after serving a page.
 
     Returns:
-        dict: A dictionary containing paginated search results with:
+        str or bytes: The JSON encoded search results (compressed bytes if "compression" is given) with:
             - "currentPage": The current page number.
             - "totalPages": The total number of pages.
-            - "dockets": A list of dockets for the current page.
+            - "dockets": A list of dockets for the current page, each with the fields in
+              utils.encoding.DOCKET_FIELDS whether the page was refreshed or read from stored results.
+            - "approximate": For approximate searches, the share of matching documents sampled, the
+              timeout status and whether docket totals were known for each index; unknown totals are None. Each docket's "comments" and "attachments" then include the
+              "error", the most the true "match" can differ from the estimate.
+              Later pages of the same stored results carry the same "approximate" and comment "error".
     """
     searchTerm = search_params["searchTerm"]
     pageNumber = search_params["pageNumber"]
@@ -257,47 +966,63 @@ def search(search_params):
     sortParams = search_params["sortParams"]
     filterParams = search_params["filterParams"]
 
-    perPage = 10
-    pages = 10
+    perPage = PER_PAGE
+    pages = PAGES
     totalResults = perPage * pages
+    # Summaries are the largest enriched field, so they are not read when the response leaves them out
+    fields = search_params.get("fields")
+    include_summary = fields is None or "summary" in fields
 
     if refreshResults:
-        drop_previous_results(searchTerm, sessionID, sortParams, filterParams)
-
-        comment_results = query_OpenSearch(searchTerm, 'comments', 'commentText')
-        attachment_results = query_OpenSearch(searchTerm, 'comments_extracted_text', 'extractedText')
-
-        os_results = []
-
-        for docket in comment_results:
-            matching_comments = comment_results.get(docket, {}).get("match", 0)
-            total_comments = comment_results.get(docket, {}).get("total", 0)
-            matching_attachments = attachment_results.get(docket, {}).get("match", 0)
-            total_attachments = attachment_results.get(docket, {}).get("total", 0)
-            if matching_comments == 0 and matching_attachments == 0:
-                continue
-            os_results.append(
-                {
-                    "id": docket,
-                    "comments": {
-                        "match": matching_comments,
-                        "total": total_comments,
-                    },
-                    "attachments": {
-                        "match": matching_attachments,
-                        "total": total_attachments,
-                    },
-                }
-            )
+        clear_prefetched_pages(searchTerm, sessionID)
 
-        results = append_docket_fields(os_results, conn)
-        results = append_agency_fields(results, conn)
-        results = append_document_dates(results, conn)
-        results = append_summary(results, conn)
-        results = filter_dockets(results, filterParams)
+        if search_params.get("refreshMode", "full") == "incremental":
+            ranking = incremental_refresh(searchTerm, sessionID, sortParams, filterParams, totalResults)
+            if ranking is not None:
+                # Drop pages prefetched while the stored ranks were being rewritten
+                clear_prefetched_pages(searchTerm, sessionID)
 
-        for docket in results:
-            docket["matchQuality"] = calc_relevance_score(docket)
+                count_dockets = len(ranking)
+
+                count_pages = count_dockets // perPage
+                if count_dockets % perPage:
+                    count_pages += 1
+
+                count_pages = min(count_pages, pages)
+
+                ret = build_saved_page(searchTerm, sessionID, sortParams, filterParams, pageNumber, perPage, pages,
+                                       include_summary=include_summary)
+                ret["totalPages"] = count_pages
+
+                if search_params.get("prefetch", False):
+                    schedule_prefetch(searchTerm, sessionID, sortParams, filterParams, pageNumber, perPage, pages)
+
+                return encode_response(ret, fields=fields,
+                                       compression=search_params.get("compression"))
+
+        with stage("store"):
+            drop_previous_results(searchTerm, sessionID, sortParams, filterParams)
+
+        approximation = None
+
+        # refreshed_at is when the aggregations were computed, which is earlier than now when they
+        # come from the cache, so the next incremental refresh also picks up documents indexed since
+        if search_params.get("approximate", False):
+            latency_budget_ms = search_params.get("latencyBudgetMs", APPROXIMATE_LATENCY_BUDGET_MS)
+            os_results, approximation, refreshed_at = fetch_approximate_os_results(searchTerm, latency_budget_ms)
+            results = enrich_and_score(os_results, filterParams, refresh=True, include_summary=include_summary)
+        elif search_params.get("rankedQuery", False):
+            top_n = totalResults * search_params.get("overfetch", RANKED_OVERFETCH)
+            os_results, truncated, refreshed_at = fetch_os_results(searchTerm, top_n=top_n)
+            results = enrich_and_score(os_results, filterParams, refresh=True, include_summary=include_summary)
+
+            # Filters removed too many of the top candidates, so fall back to the exhaustive scan
+            if truncated and len(results) < totalResults:
+                os_results, _, refreshed_at = fetch_os_results(searchTerm)
+                results = enrich_and_score(os_results, filterParams, refresh=True, include_summary=include_summary)
+        else:
+            os_results, _, refreshed_at = fetch_os_results(searchTerm)
+            results = enrich_and_score(os_results, filterParams, refresh=True, include_summary=include_summary)
 
 
         # print(results)
@@ -327,7 +1052,22 @@ def search(search_params):
         if isinstance(filterParams, str):
             filterParams = json.loads(filterParams)
 
-        storeDockets(sorted_results, searchTerm, sessionID, sortParams, filterParams, totalResults)
+        with stage("store"):
+            storeDockets(sorted_results, searchTerm, sessionID, sortParams, filterParams, totalResults,
+                         approximation is not None)
+            stored_approximation = None
+            if approximation is not None:
+                stored_approximation = dict(approximation, errors={
+                    docket["id"]: docket["comments"].get("error") for docket in sorted_results[:totalResults]
+                })
+            record_refresh_time(searchTerm, sessionID, sortParams, filterParams, refreshed_at,
+                                [docket["id"] for docket in sorted_results[:totalResults]], stored_approximation)
+
+        # Drop pages prefetched while the stored results were being replaced
+        clear_prefetched_pages(searchTerm, sessionID)
+
+        if search_params.get("prefetch", False):
+            schedule_prefetch(searchTerm, sessionID, sortParams, filterParams, pageNumber, perPage, pages)
 
         count_dockets = len(sorted_results)
 
@@ -344,40 +1084,158 @@ def search(search_params):
                 int(perPage) * int(pageNumber) : int(perPage) * (int(pageNumber) + 1)
             ],
         }
+        for rank, docket in enumerate(ret["dockets"], int(perPage) * int(pageNumber)):
+            docket["searchRank"] = rank
 
-        return ret
+        if approximation is not None:
+            ret["approximate"] = approximation
+
+        return encode_response(ret, fields=fields, compression=search_params.get("compression"))
 
     else:
-        dockets_raw = getSavedResults(searchTerm, sessionID, sortParams, filterParams)
-        dockets = []
-        for d in dockets_raw:
-            dockets.append(
-                {
-                    "searchRank": d[0],
-                    "id": d[1],
-                    "comments": {"match": d[3], "total": d[2]},
-                    "matchQuality": d[4],
-                }
+        ret = get_cached_page(searchTerm, sessionID, sortParams, filterParams, pageNumber, perPage, pages,
+                              include_summary)
+
+        if search_params.get("prefetch", False):
+            schedule_prefetch(searchTerm, sessionID, sortParams, filterParams, pageNumber, perPage, pages)
+
+        return encode_response(ret, fields=fields, compression=search_params.get("compression"))
+
+
+def search_many(list_of_search_params):
+    """
+    Executes several searches at once. The aggregations for every refreshed search term are sent in
+    one _msearch request, the docket ids of all searches are enriched in a single pass, each result set
+    is filtered, scored and ranked on its own, and all result sets are stored in one transaction.
+    Searches that share a result set (same term, session, sort and filters) are ranked and stored once.
+    Searches that do not refresh their results, or that use "refreshMode": "incremental", "rankedQuery",
+    "approximate" or "prefetch", are served by search() after the batch is stored.
+
+    Parameters:
+        list_of_search_params (list): search_params dictionaries as accepted by search().
+
+    Returns:
+        list: The result of each search, in the same order, as search() would return it.
+    """
+    perPage = PER_PAGE
+    pages = PAGES
+    totalResults = perPage * pages
+
+    responses = [None] * len(list_of_search_params)
+    batch = []
+    single = []
+    for i, search_params in enumerate(list_of_search_params):
+        if (search_params["refreshResults"] and search_params.get("refreshMode", "full") == "full"
+                and not any(search_params.get(option, False) for option in SEARCH_ONLY_OPTIONS)):
+            batch.append(i)
+        else:
+            single.append(i)
+
+    if batch:
+        search_batch(list_of_search_params, batch, responses, perPage, pages, totalResults)
+
+    for i in single:
+        responses[i] = search(list_of_search_params[i])
+
+    return responses
+
+def search_batch(list_of_search_params, batch, responses, perPage, pages, totalResults):
+    """
+    Refreshes the searches at the given indices of list_of_search_params together for search_many(),
+    filling in their responses.
+    """
+    for i in batch:
+        clear_prefetched_pages(list_of_search_params[i]["searchTerm"], list_of_search_params[i]["sessionID"])
+
+    terms = list(dict.fromkeys(list_of_search_params[i]["searchTerm"] for i in batch))
+    requests = []
+    for term in terms:
+        requests.append((term, 'comments', 'commentText'))
+        requests.append((term, 'comments_extracted_text', 'extractedText'))
+
+    with stage("opensearch"):
+        aggregations = cached_msearch_OpenSearch(requests)
+    os_by_term = {
+        term: combine_os_results(aggregations[2 * j][0], aggregations[2 * j + 1][0]) for j, term in enumerate(terms)
+    }
+    # Cached aggregations were computed earlier, so record the oldest one as the refresh time
+    refreshed_at = min(computed_at for _, computed_at in aggregations)
+
+    # Enrich every docket once, however many searches it appears in
+    unique_dockets = {}
+    for os_results in os_by_term.values():
+        for docket in os_results:
+            unique_dockets.setdefault(docket["id"], {"id": docket["id"]})
+
+    # Dockets are shared between the searches, so the summary is read if any of them includes it
+    include_summary = any(list_of_search_params[i].get("fields") is None
+                          or "summary" in list_of_search_params[i]["fields"] for i in batch)
+
+    with stage("enrichment"):
+        enriched = enrich_dockets(list(unique_dockets.values()), refresh=True, include_summary=include_summary)
+    metadata = {docket["id"]: docket for docket in enriched}
+
+    result_sets = []
+    rankings = {}
+    for i in batch:
+        search_params = list_of_search_params[i]
+        searchTerm = search_params["searchTerm"]
+        sessionID = search_params["sessionID"]
+        sortParams = search_params["sortParams"]
+        filterParams = search_params["filterParams"]
+        pageNumber = search_params["pageNumber"]
+
+        # Searches for the same result set differ at most in the page they ask for
+        key = result_set_params(searchTerm, sessionID, sortParams, filterParams)
+        if key not in rankings:
+            results = []
+            for docket in os_by_term[searchTerm]:
+                if docket["id"] not in metadata:
+                    continue
+                combined = {"id": docket["id"], "comments": dict(docket["comments"]), "attachments": dict(docket["attachments"])}
+                # Enriched fields are shared between searches; they are only read from here on
+                for field, value in metadata[docket["id"]].items():
+                    if field != "id":
+                        combined[field] = value
+                results.append(combined)
+
+            with stage("filter_score"):
+                results = filter_dockets(results, filterParams)
+
+                for docket in results:
+                    docket["matchQuality"] = calc_relevance_score(docket)
+
+            rankings[key] = sorted(
+                results, key=lambda x: x.get("comments").get("match"), reverse=True
             )
-        dockets = sorted(dockets, key=lambda x: x["searchRank"])
-        dockets = dockets[perPage * pageNumber : perPage * (pageNumber + 1)]
+            result_sets.append((searchTerm, sessionID, sortParams, filterParams, rankings[key]))
+
+        sorted_results = rankings[key]
+
+        count_dockets = len(sorted_results)
 
-        count_dockets = len(dockets)
-        
         count_pages = count_dockets // perPage
         if count_dockets % perPage:
             count_pages += 1
 
         count_pages = min(count_pages, pages)
 
-        dockets = append_docket_fields(dockets, conn)
-        dockets = append_agency_fields(dockets, conn)
-        dockets = append_document_dates(dockets, conn)
-        dockets = append_summary(dockets, conn)
+        ret = {
+            "currentPage": pageNumber,
+            "totalPages": count_pages,
+            "dockets": sorted_results[perPage * pageNumber : perPage * (pageNumber + 1)],
+        }
+        for rank, docket in enumerate(ret["dockets"], perPage * pageNumber):
+            docket["searchRank"] = rank
+        responses[i] = encode_response(ret, fields=search_params.get("fields"),
+                                       compression=search_params.get("compression"))
 
-        ret = {"currentPage": pageNumber, "totalPages": count_pages, "dockets": dockets}
+    with stage("store"):
+        store_result_sets(result_sets, totalResults, refreshed_at)
 
-        return json.dumps(ret)
+    # Drop pages prefetched while the stored results were being replaced
+    for searchTerm, sessionID, _, _, _ in result_sets:
+        clear_prefetched_pages(searchTerm, sessionID)
 
 
 if __name__ == "__main__":
@@ -407,6 +1265,6 @@ if __name__ == "__main__":
     searchTerm = query_params["searchTerm"]
     print(f"searchTerm: {searchTerm}")
 
-    result = search(json.dumps(query_params))
+    result = search(query_params)
 
-    print(json.dumps(result, indent=4))
\ No newline at end of file
+    print(json.dumps(json.loads(result), indent=4))
\ No newline at end of file
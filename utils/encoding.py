@@ -0,0 +1,82 @@
+import gzip
+import json
+
+# orjson and brotli are optional; the standard library json encoder and gzip are used without them
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Top-level fields of every docket in a response, in order. "summary" is left out when a docket has none,
+# as in append_summary; "attachments" is null for pages read back from stored results, which keep no attachment counts.
+DOCKET_FIELDS = ("id", "searchRank", "title", "docketType", "agencyID", "agencyName", "timelineDates",
+                 "isOpenForComment", "summary", "comments", "attachments", "matchQuality")
+
+
+def normalize_docket(docket):
+    """
+    Returns a copy of a docket with exactly the DOCKET_FIELDS, in order, whichever path produced it.
+    """
+    return {field: docket.get(field) for field in DOCKET_FIELDS if field != "summary" or field in docket}
+
+
+def project_dockets(response, fields):
+    """
+    Returns a copy of a search response whose dockets only contain the given top-level fields.
+    """
+    projected = dict(response)
+    projected["dockets"] = [
+        {field: docket[field] for field in fields if field in docket}
+        for docket in response.get("dockets", [])
+    ]
+    return projected
+
+
+def dumps(response):
+    """
+    Serializes a response to a compact JSON string, using orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(response).decode("utf-8")
+    return json.dumps(response, separators=(",", ":"))
+
+
+def encode_response(response, fields=None, compression=None):
+    """
+    Encodes a search response as JSON, normalizing every docket with normalize_docket.
+
+    Parameters:
+        response (dict): The response with "currentPage", "totalPages" and "dockets".
+        fields (list, optional): Docket fields to keep, e.g. ["id", "title", "comments"]; all fields if None.
+        compression (str, optional): "gzip" or "br" to compress the JSON.
+
+    Returns:
+        str or bytes: The JSON string, or the compressed JSON bytes if compression is given.
+
+    Raises:
+        ValueError: If the compression is unknown or brotli is requested but not installed.
+    """
+    response = dict(response)
+    response["dockets"] = [normalize_docket(docket) for docket in response.get("dockets", [])]
+
+    if fields is not None:
+        response = project_dockets(response, fields)
+
+    encoded = dumps(response)
+
+    if compression is None:
+        return encoded
+    if compression == "gzip":
+        return gzip.compress(encoded.encode("utf-8"))
+    if compression == "br":
+        if brotli is None:
+            raise ValueError("brotli compression requested but the brotli package is not installed")
+        return brotli.compress(encoded.encode("utf-8"))
+
+    raise ValueError(f"Unknown compression: {compression}")
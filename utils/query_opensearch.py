@@ -1,9 +1,32 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
 from queries.utils.opensearch import connect as create_client
 
+# Field holding the time a comment was written to the index, used by incremental refreshes
+INDEXED_AT_FIELD = os.getenv("OPENSEARCH_INDEXED_AT_FIELD", "indexedAt")
+# Upper bound on the time between a document's INDEXED_AT_FIELD stamp and it becoming searchable.
+# Refresh times are recorded this much earlier, so documents still becoming searchable during a refresh
+# are found by the next incremental refresh.
+INDEXING_LAG_SECONDS = int(os.getenv("OPENSEARCH_INDEXING_LAG_SECONDS", "60"))
+indexed_at_checked = set()
+
+# Aggregation results are cached per (search term, index, field) until they expire, are evicted,
+# or the index generation (its document count) changes. The generation is checked at most
+# every GENERATION_CHECK_SECONDS per index.
+AGGREGATION_CACHE_TTL_SECONDS = int(os.getenv("AGGREGATION_CACHE_TTL_SECONDS", "900"))
+AGGREGATION_CACHE_MAX_ENTRIES = int(os.getenv("AGGREGATION_CACHE_MAX_ENTRIES", "256"))
+GENERATION_CHECK_SECONDS = 30
+aggregation_cache = OrderedDict()
+index_generations = {}
+aggregation_cache_lock = threading.Lock()
+
 client = create_client()
-def query_OpenSearch(search_term, index_name, field_name):
+def build_docketId_stats_query(search_term, field_name, docket_ids=None, top_n=None):
     """
-    Runs an OpenSearch aggregation query to get docketId stats.
+    Builds the body of the docketId stats aggregation query used by query_OpenSearch.
     """
     query = {
         "size": 0,  # No need to fetch individual documents
@@ -26,9 +49,21 @@ def query_OpenSearch(search_term, index_name, field_name):
         }
     }
 
-    # Execute the query
-    response = client.search(index=index_name, body=query)
+    if docket_ids is not None:
+        query["query"] = {"terms": {"docketId.keyword": list(docket_ids)}}
+        query["aggs"]["docketId_stats"]["terms"]["size"] = max(len(docket_ids), 1)
+
+    if top_n is not None:
+        query["aggs"]["docketId_stats"]["terms"]["size"] = top_n
+        query["aggs"]["docketId_stats"]["terms"]["order"] = {"matching_comments": "desc"}
 
+    return query
+
+
+def parse_docketId_stats(response):
+    """
+    Converts a docketId stats aggregation response into a dictionary of docket counts.
+    """
     # Extract the aggregation results
     dockets = response["aggregations"]["docketId_stats"]["buckets"]
 
@@ -45,4 +80,397 @@ def query_OpenSearch(search_term, index_name, field_name):
             "match": matching_comments
         }
     
-    return dockets_dict
\ No newline at end of file
+    return dockets_dict
+
+
+def query_OpenSearch(search_term, index_name, field_name, docket_ids=None, top_n=None):
+    """
+    Runs an OpenSearch aggregation query to get docketId stats.
+    If docket_ids is given, only those dockets are counted.
+    If top_n is given, the buckets are ordered by matching comments and only the top_n are returned.
+    """
+    query = build_docketId_stats_query(search_term, field_name, docket_ids=docket_ids, top_n=top_n)
+
+    # Execute the query
+    response = client.search(index=index_name, body=query)
+
+    return parse_docketId_stats(response)
+
+
+def msearch_OpenSearch(requests):
+    """
+    Runs several docketId stats aggregations in a single _msearch request.
+
+    Parameters:
+        requests (list): (search_term, index_name, field_name) tuples.
+
+    Returns:
+        list: A dictionary of docket counts for each request, in the same order.
+    """
+    if not requests:
+        return []
+
+    body = []
+    for search_term, index_name, field_name in requests:
+        body.append({"index": index_name})
+        body.append(build_docketId_stats_query(search_term, field_name))
+
+    responses = client.msearch(body=body)["responses"]
+
+    results = []
+    for request, response in zip(requests, responses):
+        if "error" in response:
+            raise RuntimeError(f"OpenSearch msearch failed for {request}: {response['error']}")
+        results.append(parse_docketId_stats(response))
+
+    return results
+
+
+def iter_docketId_stats(search_term, index_name, field_name, page_size=1000):
+    """
+    Streams the docketId stats of every docket with a composite aggregation, one page of buckets at a time.
+
+    Yields:
+        tuple: (docketID, total comments, matching comments) for each docket.
+    """
+    query = {
+        "size": 0,
+        "aggs": {
+            "docketId_stats": {
+                "composite": {
+                    "size": page_size,
+                    "sources": [
+                        {"docketId": {"terms": {"field": "docketId.keyword"}}}
+                    ]
+                },
+                "aggs": {
+                    "matching_comments": {
+                        "filter": {
+                            "match_phrase": {
+                                field_name: search_term
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+    while True:
+        response = client.search(index=index_name, body=query)
+        stats = response["aggregations"]["docketId_stats"]
+
+        for docket in stats["buckets"]:
+            yield docket["key"]["docketId"], docket["doc_count"], docket["matching_comments"]["doc_count"]
+
+        if not stats["buckets"] or "after_key" not in stats:
+            return
+        query["aggs"]["docketId_stats"]["composite"]["after"] = stats["after_key"]
+
+
+def check_indexed_at_field(index_name):
+    """
+    Raises a ValueError if INDEXED_AT_FIELD is not mapped in index_name, since a range query on an
+    unmapped field silently matches nothing. Each index is checked once per process.
+    """
+    if index_name in indexed_at_checked:
+        return
+
+    response = client.indices.get_field_mapping(index=index_name, fields=INDEXED_AT_FIELD)
+    if not any(INDEXED_AT_FIELD in mapping.get("mappings", {}) for mapping in response.values()):
+        raise ValueError(f"Field {INDEXED_AT_FIELD} is not mapped in index {index_name}; "
+                         "set OPENSEARCH_INDEXED_AT_FIELD to the field holding the time documents were indexed")
+
+    indexed_at_checked.add(index_name)
+
+
+def query_changed_dockets(index_name, since):
+    """
+    Returns the set of docketIds that have documents indexed in index_name after the given datetime.
+    Raises a ValueError if the index has no INDEXED_AT_FIELD mapping.
+    """
+    check_indexed_at_field(index_name)
+
+    query = {
+        "size": 0,
+        "query": {
+            "range": {
+                INDEXED_AT_FIELD: {"gt": since.isoformat()}
+            }
+        },
+        "aggs": {
+            "docketId_stats": {
+                "terms": {
+                    "field": "docketId.keyword",
+                    "size": 1000000
+                }
+            }
+        }
+    }
+
+    response = client.search(index=index_name, body=query)
+
+    return {docket["key"] for docket in response["aggregations"]["docketId_stats"]["buckets"]}
+
+
+def query_docket_totals(index_name):
+    """
+    Counts the documents of every docket in an index. The counts do not depend on the search term.
+
+    Returns:
+        dict: A dictionary mapping docketIDs to their number of documents.
+    """
+    query = {
+        "size": 0,
+        "aggs": {
+            "docketId_stats": {
+                "terms": {
+                    "field": "docketId.keyword",
+                    "size": 1000000
+                }
+            }
+        }
+    }
+
+    response = client.search(index=index_name, body=query)
+
+    return {docket["key"]: docket["doc_count"] for docket in response["aggregations"]["docketId_stats"]["buckets"]}
+
+
+def query_OpenSearch_sampled(search_term, index_name, field_name, sample_size, totals, timeout_ms=None):
+    """
+    Runs an approximate version of the docketId stats aggregation for very broad search terms.
+    The phrase is the query, and a sampler aggregation keeps only the sample_size best-scoring matches
+    of each shard, so dockets are bucketed over the sample instead of over every match.
+    A docket's matching comments are estimated by scaling its sampled matches by the ratio of all
+    matches to sampled matches. Its error bounds how far the true count can be from the estimate:
+    at least the sampled matches, and at most those plus every unsampled match, up to its total.
+    If timeout_ms is given, OpenSearch returns whatever it has collected when the time runs out.
+
+    Parameters:
+        totals (dict): Exact number of documents of each docket in the index, as from query_docket_totals,
+                       or None if they are not known, in which case every "total" is None.
+
+    Returns:
+        tuple: A dictionary mapping sampled docketIDs to "total", estimated "match" and its "error",
+               and a dictionary with the "sampleRatio" of matches sampled, whether the query "timedOut"
+               and whether "totalsKnown".
+    """
+    query = {
+        "size": 0,
+        "track_total_hits": True,
+        "query": {
+            "match_phrase": {
+                field_name: search_term
+            }
+        },
+        "aggs": {
+            "sample": {
+                "sampler": {
+                    "shard_size": sample_size
+                },
+                "aggs": {
+                    "docketId_stats": {
+                        "terms": {
+                            "field": "docketId.keyword",
+                            "size": 1000000
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+    if timeout_ms is not None:
+        query["timeout"] = f"{int(timeout_ms)}ms"
+
+    response = client.search(index=index_name, body=query)
+    timed_out = response.get("timed_out", False)
+    sample = response["aggregations"]["sample"]
+    sampled_total = sample["doc_count"]
+    # The aggregation already visits every match, so counting them adds no work
+    match_total = max(response["hits"]["total"]["value"], sampled_total)
+    ratio = sampled_total / match_total if match_total else 1.0
+    unsampled = match_total - sampled_total
+
+    dockets_dict = {}
+
+    for docket in sample["docketId_stats"]["buckets"]:
+        sampled = docket["doc_count"]
+        total = None if totals is None else max(totals.get(docket["key"], sampled), sampled)
+        upper = sampled + unsampled if total is None else min(total, sampled + unsampled)
+        estimate = min(upper, round(sampled / ratio))
+        dockets_dict[docket["key"]] = {
+            "total": total,
+            "match": estimate,
+            "error": max(estimate - sampled, upper - estimate)
+        }
+
+    return dockets_dict, {"sampleRatio": ratio, "timedOut": timed_out, "totalsKnown": totals is not None}
+
+
+def get_index_generation(index_name):
+    """
+    Returns the current generation of an index, its document count, re-reading it from OpenSearch
+    only when the last check is older than GENERATION_CHECK_SECONDS.
+    """
+    now = time.monotonic()
+    with aggregation_cache_lock:
+        checked = index_generations.get(index_name)
+    if checked is not None and now - checked[0] < GENERATION_CHECK_SECONDS:
+        return checked[1]
+
+    generation = client.count(index=index_name)["count"]
+    with aggregation_cache_lock:
+        index_generations[index_name] = (now, generation)
+    return generation
+
+
+def invalidate_aggregation_cache(index_name=None):
+    """
+    Drops cached aggregations for an index, or for every index if index_name is None.
+    Meant to be called as a refresh marker once the ingest pipeline has written to an index.
+    """
+    with aggregation_cache_lock:
+        for key in list(aggregation_cache):
+            if index_name is None or key[1] == index_name:
+                del aggregation_cache[key]
+        if index_name is None:
+            index_generations.clear()
+        else:
+            index_generations.pop(index_name, None)
+
+
+def cached_query_OpenSearch(search_term, index_name, field_name, top_n=None):
+    """
+    Runs query_OpenSearch through the aggregation cache.
+    The returned dictionary is shared between callers and must not be modified.
+
+    Returns:
+        tuple: The dictionary of docket counts, and the time the query was sent to OpenSearch,
+               which is earlier than now when the counts come from the cache.
+    """
+    key = (search_term, index_name, field_name, top_n)
+    generation = get_index_generation(index_name)
+
+    cached = get_cached_aggregation(key, generation)
+    if cached is not None:
+        return cached
+
+    computed_at = datetime.now(timezone.utc)
+    dockets_dict = query_OpenSearch(search_term, index_name, field_name, top_n=top_n)
+    put_cached_aggregation(key, generation, dockets_dict, computed_at)
+
+    return dockets_dict, computed_at
+
+
+def peek_docket_totals(index_name):
+    """
+    Returns the number of documents of every docket in an index without querying, or None if they are
+    not known. The totals are taken from the term-independent totals entry or from any cached exhaustive
+    aggregation of the current index generation, which then fills the totals entry.
+    The returned dictionary is shared between callers and must not be modified.
+    """
+    key = (None, index_name, None, None)
+    generation = get_index_generation(index_name)
+
+    cached = get_cached_aggregation(key, generation)
+    if cached is not None:
+        return cached[0]
+
+    with aggregation_cache_lock:
+        exhaustive = [entry_key for entry_key in aggregation_cache
+                      if entry_key[0] is not None and entry_key[1] == index_name and entry_key[3] is None]
+    for entry_key in exhaustive:
+        cached = get_cached_aggregation(entry_key, generation)
+        if cached is not None:
+            totals = {docket_id: counts["total"] for docket_id, counts in cached[0].items()}
+            put_cached_aggregation(key, generation, totals, cached[1])
+            return totals
+
+    return None
+
+
+def cached_docket_totals(index_name):
+    """
+    Returns the number of documents of every docket in an index, as from peek_docket_totals, or else
+    counted once with query_docket_totals and cached under a term-independent key.
+    The returned dictionary is shared between callers and must not be modified.
+    """
+    totals = peek_docket_totals(index_name)
+    if totals is not None:
+        return totals
+
+    generation = get_index_generation(index_name)
+    computed_at = datetime.now(timezone.utc)
+    totals = query_docket_totals(index_name)
+    put_cached_aggregation((None, index_name, None, None), generation, totals, computed_at)
+    return totals
+
+
+def peek_cached_query_OpenSearch(search_term, index_name, field_name):
+    """
+    Returns the cached exhaustive aggregation for a search term and the time it was computed
+    if there is a current one, without querying, otherwise None.
+    The returned dictionary is shared between callers and must not be modified.
+    """
+    return get_cached_aggregation((search_term, index_name, field_name, None), get_index_generation(index_name))
+
+
+def cached_msearch_OpenSearch(requests):
+    """
+    Runs msearch_OpenSearch through the aggregation cache, sending only the uncached requests.
+    The returned dictionaries are shared between callers and must not be modified.
+
+    Returns:
+        list: A (dictionary of docket counts, time computed) tuple for each request, in the same order.
+    """
+    generations = {index_name: get_index_generation(index_name) for _, index_name, _ in requests}
+
+    results = [None] * len(requests)
+    missing = []
+    for i, (search_term, index_name, field_name) in enumerate(requests):
+        results[i] = get_cached_aggregation((search_term, index_name, field_name, None), generations[index_name])
+        if results[i] is None:
+            missing.append(i)
+
+    unique_missing = list(dict.fromkeys(requests[i] for i in missing))
+    computed_at = datetime.now(timezone.utc)
+    fetched = dict(zip(unique_missing, msearch_OpenSearch(unique_missing)))
+    for request, dockets_dict in fetched.items():
+        search_term, index_name, field_name = request
+        put_cached_aggregation((search_term, index_name, field_name, None), generations[index_name],
+                               dockets_dict, computed_at)
+    for i in missing:
+        results[i] = (fetched[requests[i]], computed_at)
+
+    return results
+
+
+def get_cached_aggregation(key, generation):
+    """
+    Returns a cached aggregation and the time it was computed if it is from the current index generation
+    and has not expired, otherwise None.
+    """
+    with aggregation_cache_lock:
+        entry = aggregation_cache.get(key)
+        if entry is None:
+            return None
+        created, entry_generation, dockets_dict, computed_at = entry
+        if entry_generation == generation and time.monotonic() - created < AGGREGATION_CACHE_TTL_SECONDS:
+            aggregation_cache.move_to_end(key)
+            return dockets_dict, computed_at
+        del aggregation_cache[key]
+        return None
+
+
+def put_cached_aggregation(key, generation, dockets_dict, computed_at):
+    """
+    Stores an aggregation and the time its query was sent in the cache,
+    evicting the least recently used entries beyond the size bound.
+    """
+    with aggregation_cache_lock:
+        aggregation_cache[key] = (time.monotonic(), generation, dockets_dict, computed_at)
+        aggregation_cache.move_to_end(key)
+        while len(aggregation_cache) > AGGREGATION_CACHE_MAX_ENTRIES:
+            aggregation_cache.popitem(last=False)
@@ -298,3 +298,35 @@ def append_summary(dockets_list, db_conn=None):
         logging.info("Database connection closed.")
 
     return dockets_list
+
+
+def get_modify_dates(docket_ids, db_conn=None):
+    '''
+    Return a dictionary mapping each given docket id found in the dockets table to its modify_date as an ISO string
+    '''
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    conn = db_conn if db_conn else get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("""
+            SELECT docket_id, modify_date
+            FROM dockets
+            WHERE docket_id = ANY(%s)
+        """, (list(docket_ids),))
+
+        modify_dates = {row[0]: row[1].isoformat() if row[1] is not None else None for row in cursor.fetchall()}
+
+        logging.info("Successfully retrieved modify dates.")
+
+    except Exception as e:
+        logging.error(f"Error executing SQL query: {e}")
+        raise DataRetrievalError("Failed to retrieve modify dates.")
+
+    finally:
+        cursor.close()
+        if not db_conn:
+            conn.close()
+        logging.info("Database connection closed.")
+
+    return modify_dates
@@ -0,0 +1,53 @@
+import time
+from contextlib import contextmanager
+
+# Callback receiving (stage name, seconds) for every timed stage, or None when timing is off
+stage_recorder = None
+
+
+def set_stage_recorder(recorder):
+    """
+    Sets the callback that receives (stage name, seconds) for every timed pipeline stage.
+    Pass None to turn stage timing off.
+    """
+    global stage_recorder
+    stage_recorder = recorder
+
+
+@contextmanager
+def stage(name):
+    """
+    Times the enclosed block as a pipeline stage and reports it to the stage recorder, if one is set.
+    """
+    recorder = stage_recorder
+    if recorder is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder(name, time.perf_counter() - start)
+
+
+# Callback receiving (location, exception) for every error the pipeline handles without raising, or None
+error_recorder = None
+
+
+def set_error_recorder(recorder):
+    """
+    Sets the callback that receives (location, exception) for every error that is printed and
+    recovered from instead of raised. Pass None to stop reporting them.
+    """
+    global error_recorder
+    error_recorder = recorder
+
+
+def report_error(location, error):
+    """
+    Reports an error the pipeline recovered from to the error recorder, if one is set.
+    """
+    recorder = error_recorder
+    if recorder is not None:
+        recorder(location, error)
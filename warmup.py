@@ -0,0 +1,97 @@
+"""
+In-process warm-up for new containers. Opens the database and OpenSearch connections, preloads
+metadata for the dockets that appear most often in stored results, which page reads reuse, and
+precomputes the comment and attachment aggregations of the most popular search terms, within a time budget.
+Ranked results are not precomputed: refreshes read docket metadata from the database regardless of the
+cache, so only the aggregations they are built from can be prepared ahead of time.
+
+Everything is warmed in the caches of the calling process only, so warm_up() must be called from the
+container's own init code; running it in a separate process warms nothing that search() can use.
+Precomputed aggregations expire after AGGREGATION_CACHE_TTL_SECONDS and docket metadata after
+DOCKET_METADATA_TTL_SECONDS, so a long-lived container has to call warm_up() again to stay warm.
+"""
+import time
+from queries.query import conn, enrich_dockets, fetch_os_results
+from queries.utils.query_opensearch import get_index_generation
+
+
+def get_popular_terms(limit):
+    """
+    Returns the search terms used by the most sessions in stored_results.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("""
+        SELECT search_term, COUNT(DISTINCT session_id) AS sessions
+        FROM stored_results
+        GROUP BY search_term
+        ORDER BY sessions DESC
+        LIMIT %s
+        """, (limit,))
+        terms = [row[0] for row in cursor.fetchall()]
+    conn.commit()
+    return terms
+
+
+def get_popular_dockets(limit):
+    """
+    Returns the docket ids that appear most often in stored_results.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("""
+        SELECT docket_id, COUNT(*) AS refs
+        FROM stored_results
+        GROUP BY docket_id
+        ORDER BY refs DESC
+        LIMIT %s
+        """, (limit,))
+        docket_ids = [row[0] for row in cursor.fetchall()]
+    conn.commit()
+    return docket_ids
+
+
+def warm_up(top_terms=20, top_dockets=1000, time_budget_s=60):
+    """
+    Warms the connections and caches of this process used by search().
+
+    Parameters:
+        top_terms (int): Number of popular search terms whose aggregations are precomputed.
+        top_dockets (int): Number of most-referenced dockets whose metadata is preloaded.
+        time_budget_s (float): Time after which no further step is started.
+
+    Returns:
+        dict: What was warmed: "dockets" preloaded, "terms" precomputed, "skippedTerms"
+              left out by the time budget, and "elapsed" seconds.
+    """
+    start = time.monotonic()
+    summary = {"dockets": 0, "terms": [], "skippedTerms": [], "elapsed": 0.0}
+
+    def out_of_time():
+        return time.monotonic() - start >= time_budget_s
+
+    # Round trips on both connections, which also prime the index generations of the aggregation cache
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    conn.commit()
+    get_index_generation('comments')
+    get_index_generation('comments_extracted_text')
+
+    if not out_of_time():
+        docket_ids = get_popular_dockets(top_dockets)
+        summary["dockets"] = len(enrich_dockets([{"id": docket_id} for docket_id in docket_ids]))
+
+    terms = get_popular_terms(top_terms) if not out_of_time() else []
+    for term in terms:
+        if out_of_time():
+            summary["skippedTerms"].append(term)
+            continue
+
+        try:
+            fetch_os_results(term)
+            summary["terms"].append(term)
+        except Exception as e:
+            print(f"Error warming up search term {term}")
+            print(e)
+
+    summary["elapsed"] = time.monotonic() - start
+    return summary
+